@@ -1,11 +1,12 @@
 import asyncio
+from functools import lru_cache
 from typing import Sequence, Any, AsyncGenerator, Callable, Iterable
 from uuid import uuid4
 
 from .loop import extract_tool_uses, use_tools
 from .middleware import MiddlewareStack
 from .stream import StreamMiddlewareStack, BaseStreamHandler, StreamContext
-from .stream_iteration import StreamIterationMiddlewareStack, BaseStreamIterationHandler
+from .stream_iteration import StreamIterationMiddlewareStack, BaseStreamIterationHandler, DEFAULT_STREAM_BUFFER_SIZE
 from .tool import Tool
 from .llm import LLMProvider, LLMProviderFactory
 from .message import Message, ToolUse, ToolMessage
@@ -15,14 +16,14 @@ DEFAULT_MAX_ITERATIONS = 10
 
 
 class BigTalk:
-    def __init__(self):
+    def __init__(self, max_tool_concurrency: int | None = None, run_sync_tools_in_thread: bool = True,
+                 stream_buffer_size: int | None = DEFAULT_STREAM_BUFFER_SIZE):
         self._providers: dict[str, LLMProvider] = {}
-        self._provider_factories: dict[str, LLMProviderFactory] = {
-            'anthropic': self._anthropic_provider_factory,
-            'openai': self._openai_provider_factory,
-        }
-        self._stream_iteration: StreamIterationMiddlewareStack = MiddlewareStack(BaseStreamIterationHandler())
-        self._tool_execution: ToolExecutionMiddlewareStack = MiddlewareStack(BaseToolExecutionHandler())
+        self._provider_factories: dict[str, LLMProviderFactory] = self._default_provider_factories()
+        self._stream_iteration: StreamIterationMiddlewareStack = MiddlewareStack(
+            BaseStreamIterationHandler(buffer_size=stream_buffer_size))
+        self._tool_execution: ToolExecutionMiddlewareStack = ToolExecutionMiddlewareStack(
+            BaseToolExecutionHandler(max_concurrency=max_tool_concurrency, run_sync_in_thread=run_sync_tools_in_thread))
         self._streaming: StreamMiddlewareStack = MiddlewareStack(BaseStreamHandler())
 
     @property
@@ -37,6 +38,17 @@ class BigTalk:
     def tool_execution(self) -> ToolExecutionMiddlewareStack:
         return self._tool_execution
 
+    def reset(self) -> None:
+        """
+        Restores the initial state by removing custom providers, cached provider instances and all middleware.
+        Cached providers are not closed, call close() first if they hold resources.
+        """
+        self._providers.clear()
+        self._provider_factories = self._default_provider_factories()
+        self._stream_iteration.clear()
+        self._tool_execution.clear()
+        self._streaming.clear()
+
     def add_provider(self, name: str, provider_factory: LLMProviderFactory, override: bool = False) -> None:
         if not override and (name in self._providers or name in self._provider_factories):
             raise ValueError(f'Provider "{name}" is already registered.')
@@ -45,11 +57,13 @@ class BigTalk:
             del self._providers[name]
 
     @staticmethod
+    @lru_cache(maxsize=256)
     def _parse_model(model: str) -> tuple[str, str]:
-        if '/' not in model:
+        # Applications stream from a handful of models over and over, so the parsed names are cached
+        separator = model.find('/')
+        if separator < 0:
             raise ValueError(f'Invalid model name: {model}. Expected format: "provider/model_name".')
-        provider, model_name = model.split('/', 1)
-        return provider, model_name
+        return model[:separator], model[separator + 1:]
 
     def _get_provider(self, provider: str) -> LLMProvider:
         if provider in self._providers:
@@ -107,6 +121,7 @@ class BigTalk:
                      messages: Sequence[Message],
                      tools: Sequence[Callable | Tool] = None,
                      max_iterations: int = DEFAULT_MAX_ITERATIONS,
+                     only_aggregates: bool = False,
                      **kwargs: Any) -> AsyncGenerator[Message, None]:
         if not any(message['role'] == 'user' for message in messages):
             raise ValueError('At least one user message is required to generate a response.')
@@ -124,7 +139,8 @@ class BigTalk:
             _provider_resolver=self._get_llm_provider,
             max_iterations=max_iterations,
             _stream_iteration_handler=stream_iteration_handler,
-            _tool_execution_handler=tool_execution_handler
+            _tool_execution_handler=tool_execution_handler,
+            only_aggregates=only_aggregates
         )
 
         async for message in streaming_handler(ctx, **kwargs):
@@ -134,12 +150,15 @@ class BigTalk:
                            messages: Sequence[Message] = None, metadata: dict[str, Any] = None) -> object | None:
         normalized_tool = self._normalize_tools([tool])[0]
 
+        # The tool metadata is read-only, so it is shared unless per-call metadata has to be layered over it
+        tool_metadata = {**normalized_tool.metadata, **metadata} if metadata else normalized_tool.metadata
+
         tool_use = ToolUse(
             type='tool_use',
             id=str(uuid4()),
             name=normalized_tool.name,
             params=params,
-            metadata=metadata
+            metadata=tool_metadata
         )
 
         context = ToolExecutionContext(
@@ -185,6 +204,13 @@ class BigTalk:
 
         return normalized
 
+    @classmethod
+    def _default_provider_factories(cls) -> dict[str, LLMProviderFactory]:
+        return {
+            'anthropic': cls._anthropic_provider_factory,
+            'openai': cls._openai_provider_factory,
+        }
+
     @staticmethod
     def _anthropic_provider_factory() -> LLMProvider:
         from .llm.anthropic import AnthropicProvider
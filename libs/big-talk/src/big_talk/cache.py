@@ -0,0 +1,124 @@
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Protocol, Any, AsyncGenerator, Sequence
+
+from .message import OutputMessage
+from .stream_iteration import StreamIterationMiddleware, StreamIterationHandler, StreamIterationContext
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> Sequence[OutputMessage] | None: ...
+
+    async def set(self, key: str, messages: Sequence[OutputMessage], ttl: float | None = None) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class AsyncLRUCache(CacheBackend):
+    """
+    In-memory cache backend that evicts the least recently used entry once max_size is reached.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        if max_size < 1:
+            raise ValueError(f'Invalid max_size: {max_size}. Expected a positive number.')
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[float | None, tuple[OutputMessage, ...]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Sequence[OutputMessage] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, messages = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return messages
+
+    async def set(self, key: str, messages: Sequence[OutputMessage], ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (expires_at, tuple(messages))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class CacheMiddleware(StreamIterationMiddleware):
+    """
+    Stream iteration middleware that replays the messages of an earlier, identical LLM call instead of calling the
+    provider again. Only deterministic calls (temperature=0) are cached, since any other response is one sample of
+    many. The cache key covers the model, the messages, the tools and all keyword arguments passed to stream().
+    """
+
+    def __init__(self, backend: CacheBackend | None = None, ttl: float | None = 3600):
+        self.backend = backend if backend is not None else AsyncLRUCache()
+        self.ttl = ttl
+        self.stats = {'hits': 0, 'misses': 0, 'skipped': 0}
+
+    async def __call__(self, handler: StreamIterationHandler, ctx: StreamIterationContext, **kwargs: Any) \
+            -> AsyncGenerator[OutputMessage, None]:
+        if kwargs.get('temperature') != 0:
+            self.stats['skipped'] += 1
+            async for message in handler(ctx, **kwargs):
+                yield message
+            return
+
+        key = self.cache_key(ctx, **kwargs)
+
+        cached = await self.backend.get(key)
+        if cached is not None:
+            self.record_hit(key)
+            # Callers own the messages they receive and may mutate them (e.g. to inject parameters), so every replay
+            # hands out fresh copies
+            for message in cached:
+                yield copy.deepcopy(message)
+            return
+
+        self.record_miss(key)
+
+        # Only the messages the stream handler keeps in the history are replayed, not intermediate deltas. That also
+        # makes an entry valid for every caller, whether it streams with only_aggregates or not.
+        messages: list[OutputMessage] = []
+        async for message in handler(ctx, **kwargs):
+            if message['role'] == 'app' or message.get('is_aggregate'):
+                # Copied before the caller gets to change the message
+                messages.append(copy.deepcopy(message))
+            yield message
+
+        # Reached only if the stream completed, so failed or abandoned calls are never cached
+        await self.backend.set(key, messages, self.ttl)
+
+    @staticmethod
+    def cache_key(ctx: StreamIterationContext, **kwargs: Any) -> str:
+        payload = {
+            'model': ctx.model,
+            'messages': ctx.messages,
+            'tools': sorted(([tool.name, tool.description, tool.parameters] for tool in ctx.tools),
+                            key=lambda t: t[0]),
+            'kwargs': kwargs,
+        }
+        canonical = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def record_hit(self, key: str) -> None:
+        self.stats['hits'] += 1
+
+    def record_miss(self, key: str) -> None:
+        self.stats['misses'] += 1
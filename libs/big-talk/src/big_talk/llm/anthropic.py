@@ -89,29 +89,28 @@ class AnthropicProvider(LLMProvider):
         converted = []
         last_user_message_id = None
         for message in messages:
-            role = message['role']
-            content = message['content']
-            if role == 'system':
-                system_parts.append(content)
-            elif role == 'tool':
-                converted.append(MessageParam(
-                    role='user',
-                    content=[ToolResultBlockParam(type='tool_result',
-                                                  tool_use_id=block['tool_use_id'],
-                                                  content=serialize_tool_result(block['result']),
-                                                  is_error=block['is_error']) for block in content]
-                ))
-            elif role == 'user':
-                last_user_message_id = message['id']
-                converted.append(MessageParam(
-                    role='user',
-                    content=content
-                ))
-            elif role == 'assistant':
-                converted.append(MessageParam(
-                    role='assistant',
-                    content=[AnthropicProvider._from_block(block) for block in content]
-                ))
+            match message:
+                case {'role': 'system', 'content': content}:
+                    system_parts.append(content)
+                case {'role': 'tool', 'content': content}:
+                    converted.append(MessageParam(
+                        role='user',
+                        content=[ToolResultBlockParam(type='tool_result',
+                                                      tool_use_id=block['tool_use_id'],
+                                                      content=serialize_tool_result(block['result']),
+                                                      is_error=block['is_error']) for block in content]
+                    ))
+                case {'role': 'user', 'content': content}:
+                    last_user_message_id = message['id']
+                    converted.append(MessageParam(
+                        role='user',
+                        content=content
+                    ))
+                case {'role': 'assistant', 'content': content}:
+                    converted.append(MessageParam(
+                        role='assistant',
+                        content=[AnthropicProvider._from_block(block) for block in content]
+                    ))
 
         system = '\n'.join(system_parts) if system_parts else omit
         return system, converted, last_user_message_id
@@ -135,6 +134,7 @@ class AnthropicProvider(LLMProvider):
         elif block.type == 'thinking':
             return Thinking(type='thinking', thinking=block.thinking, signature=block.signature)
         elif block.type == 'tool_use':
+            # Shared instead of copied for every tool use, the tool metadata is read-only
             metadata = tool_map[block.name].metadata if block.name in tool_map else None
             return ToolUse(type='tool_use', id=block.id, name=block.name, params=block.input, metadata=metadata)
         else:
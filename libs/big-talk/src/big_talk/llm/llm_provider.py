@@ -6,6 +6,9 @@ from ..message import Message, AssistantMessage
 
 
 class LLMProvider(ABC):
+    # Lets providers declare __slots__ of their own
+    __slots__ = ()
+
     @abstractmethod
     async def count_tokens(self, model: str, messages: Sequence[Message], tools: Sequence[Tool], **kwargs) -> int:
         pass
@@ -1,4 +1,4 @@
-import json
+from functools import lru_cache
 from typing import Sequence, AsyncGenerator, TYPE_CHECKING
 from uuid import uuid4
 
@@ -8,7 +8,7 @@ from openai.types.chat import ChatCompletionMessageParam, ChatCompletionSystemMe
     ChatCompletionAssistantMessageParam, ChatCompletionFunctionToolParam
 from openai.types.chat.chat_completion_message_function_tool_call_param import Function
 
-from ..serialization import serialize_tool_result
+from ..serialization import serialize_tool_result, loads_json, dumps_json
 from ..tool import Tool
 from ..message import Message, AssistantContentBlock, Text, AssistantMessage, ToolUse
 from .llm_provider import LLMProvider
@@ -17,13 +17,21 @@ if TYPE_CHECKING:
     from tiktoken import Encoding
 
 
+@lru_cache(maxsize=8)
+def _encoding_for_model(model: str) -> 'Encoding':
+    # Resolving the encoding for a model name is repeated for every count, the BPE tables themselves are cached by
+    # tiktoken already
+    from tiktoken import encoding_for_model
+    return encoding_for_model(model)
+
+
 class OpenAIProvider(LLMProvider):
     def __init__(self, **kwargs):
         try:
             from openai import AsyncOpenAI
-            from tiktoken import encoding_for_model
+            import tiktoken  # noqa: F401
             self._client = AsyncOpenAI(**kwargs)
-            self._encoding_for_model = encoding_for_model
+            self._encoding_for_model = _encoding_for_model
         except ImportError:
             raise ImportError(
                 'The "openai" package is required to use the OpenAIProvider. '
@@ -36,9 +44,8 @@ class OpenAIProvider(LLMProvider):
     async def count_tokens(self, model: str, messages: Sequence[Message], tools: Sequence[Tool], **kwargs) -> int:
         encoding = self._encoding_for_model(model)
         converted_messages, _ = self._convert_messages(messages)
-        # TODO calculate tool tokens
-        # https://github.com/openai/openai-cookbook/blob/main/examples/How_to_count_tokens_with_tiktoken.ipynb
-        return self._count_message_tokens(converted_messages, model, encoding)
+        return self._count_message_tokens(converted_messages, model, encoding) + \
+            self._count_tool_tokens(tools, encoding)
 
     async def send(self, model: str, messages: Sequence[Message], tools: Sequence[Tool], **kwargs) -> AssistantMessage:
         converted, last_user_message_id = self._convert_messages(messages)
@@ -58,9 +65,9 @@ class OpenAIProvider(LLMProvider):
                         type='tool_use',
                         id=tool_call.id,
                         name=tool_call.function.name,
-                        params=json.loads(tool_call.function.arguments),
-                        metadata=tool_map[
-                            tool_call.function.name].metadata if tool_call.function.name in tool_map else None
+                        params=loads_json(tool_call.function.arguments),
+                        metadata=tool_map[tool_call.function.name].metadata
+                        if tool_call.function.name in tool_map else None
                     ))
 
         return AssistantMessage(id=str(uuid4()), role='assistant', content=blocks, parent_id=last_user_message_id,
@@ -89,12 +96,19 @@ class OpenAIProvider(LLMProvider):
 
         message_id = str(uuid4())
         async for chunk in stream:
-            delta = chunk.choices[0].delta
+            choices = chunk.choices
+            # e.g. the trailing usage chunk of stream_options={'include_usage': True} carries no choices
+            if not choices:
+                continue
 
-            if delta.content:
-                text_buffer.append(delta.content)
+            delta = choices[0].delta
+            content = delta.content
+            tool_calls = delta.tool_calls
 
-            if delta.tool_calls:
+            if content:
+                text_buffer.append(content)
+
+            if tool_calls:
                 if text_buffer:
                     full_text = ''.join(text_buffer)
                     block = Text(type='text', text=full_text)
@@ -107,9 +121,9 @@ class OpenAIProvider(LLMProvider):
                         parent_id=last_user_message_id,
                         is_aggregate=False
                     )
-                    text_buffer = []
+                    text_buffer.clear()
 
-                for tool_chunk in delta.tool_calls:
+                for tool_chunk in tool_calls:
                     idx = tool_chunk.index
 
                     if current_tool_index is not None and idx != current_tool_index:
@@ -127,15 +141,16 @@ class OpenAIProvider(LLMProvider):
 
                         current_tool_id = ''
                         current_tool_name = ''
-                        current_tool_args = []
+                        current_tool_args.clear()
 
                     current_tool_index = idx
                     if tool_chunk.id:
                         current_tool_id = tool_chunk.id
-                    if tool_chunk.function.name:
-                        current_tool_name = tool_chunk.function.name
-                    if tool_chunk.function.arguments:
-                        current_tool_args.append(tool_chunk.function.arguments)
+                    function = tool_chunk.function
+                    if function.name:
+                        current_tool_name = function.name
+                    if function.arguments:
+                        current_tool_args.append(function.arguments)
 
         if text_buffer:
             full_text = ''.join(text_buffer)
@@ -186,12 +201,13 @@ class OpenAIProvider(LLMProvider):
 
     @staticmethod
     def _build_tool_use_block(tool_id: str, tool_name: str, arg_parts: list[str], tool_map: dict[str, Tool]) -> ToolUse:
+        # Shared instead of copied for every tool use, the tool metadata is read-only
         metadata = tool_map[tool_name].metadata if tool_name in tool_map else None
         return ToolUse(
             type='tool_use',
             id=tool_id,
             name=tool_name,
-            params=json.loads(''.join(arg_parts)),
+            params=loads_json(''.join(arg_parts)),
             metadata=metadata
         )
 
@@ -201,55 +217,68 @@ class OpenAIProvider(LLMProvider):
         last_user_message_id = None
 
         for message in messages:
-            role = message['role']
-            content = message['content']
-
-            if role == 'system':
-                converted.append(ChatCompletionSystemMessageParam(
-                    role='system',
-                    content=content
-                ))
-
-            elif role == 'tool':
-                last_user_message_id = message['id']
-                for block in content:
-                    converted.append(ChatCompletionToolMessageParam(
-                        role='tool',
-                        tool_call_id=block['tool_use_id'],
-                        content=serialize_tool_result(block['result']),
+            match message:
+                case {'role': 'system', 'content': content}:
+                    converted.append(ChatCompletionSystemMessageParam(
+                        role='system',
+                        content=content
                     ))
 
-            elif role == 'user':
-                converted.append(ChatCompletionUserMessageParam(
-                    role='user',
-                    content=content
-                ))
-
-            elif role == 'assistant':
-                text_parts: list[str] = []
-                tool_calls: list[ChatCompletionMessageFunctionToolCallParam] = []
-
-                for block in content:
-                    if block['type'] == 'text':
-                        text_parts.append(block['text'])
-                    elif block['type'] == 'tool_use':
-                        tool_calls.append(ChatCompletionMessageFunctionToolCallParam(
-                            id=block['id'],
-                            type='function',
-                            function=Function(
-                                name=block['name'],
-                                arguments=json.dumps(block['params'])
-                            )
+                case {'role': 'tool', 'content': content}:
+                    last_user_message_id = message['id']
+                    for block in content:
+                        converted.append(ChatCompletionToolMessageParam(
+                            role='tool',
+                            tool_call_id=block['tool_use_id'],
+                            content=serialize_tool_result(block['result']),
                         ))
 
-                converted.append(ChatCompletionAssistantMessageParam(
-                    role='assistant',
-                    content='\n'.join(text_parts) if text_parts else None,
-                    tool_calls=tool_calls if tool_calls else None
-                ))
+                case {'role': 'user', 'content': content}:
+                    converted.append(ChatCompletionUserMessageParam(
+                        role='user',
+                        content=content
+                    ))
+
+                case {'role': 'assistant', 'content': content}:
+                    text_parts: list[str] = []
+                    tool_calls: list[ChatCompletionMessageFunctionToolCallParam] = []
+
+                    for block in content:
+                        match block:
+                            case {'type': 'text', 'text': text}:
+                                text_parts.append(text)
+                            case {'type': 'tool_use', 'id': tool_use_id, 'name': name, 'params': params}:
+                                tool_calls.append(ChatCompletionMessageFunctionToolCallParam(
+                                    id=tool_use_id,
+                                    type='function',
+                                    function=Function(
+                                        name=name,
+                                        arguments=dumps_json(params)
+                                    )
+                                ))
+
+                    converted.append(ChatCompletionAssistantMessageParam(
+                        role='assistant',
+                        content='\n'.join(text_parts) if text_parts else None,
+                        tool_calls=tool_calls if tool_calls else None
+                    ))
 
         return converted, last_user_message_id
 
+    @staticmethod
+    def _count_tool_tokens(tools: Sequence[Tool], encoding: 'Encoding') -> int:
+        if not tools:
+            return 0
+
+        # Approximation based on
+        # https://github.com/openai/openai-cookbook/blob/main/examples/How_to_count_tokens_with_tiktoken.ipynb
+        # All definitions are encoded in a single call instead of one call per field, the separators only cost a
+        # token each, which is well within the precision of the estimate.
+        tokens_per_tool = 7
+        tools_overhead = 12
+        payload = '\n'.join(f'{tool.name}\n{tool.description}\n{tool.parameters_json}' for tool in tools)
+        return len(encoding.encode(payload)) + tokens_per_tool * len(tools) + tools_overhead
+
     @staticmethod
     def _count_message_tokens(messages: list[ChatCompletionMessageParam], model: str, encoding: 'Encoding') -> int:
         # Constants for message overhead
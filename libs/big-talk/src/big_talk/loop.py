@@ -1,11 +1,13 @@
-import asyncio
+import logging
 from collections import defaultdict
-from typing import Sequence
+from typing import Sequence, AsyncGenerator, Awaitable
 
 from .tool import Tool
 from .tool_execution import ToolExecutionContext, ToolExecutionHandler
 from .message import OutputMessage, ToolUse, Message, ToolResult
 
+logger = logging.getLogger(__name__)
+
 
 def extract_tool_uses(message: OutputMessage) -> list[tuple[str, ToolUse]]:
     parent_id = message['id']
@@ -20,6 +22,25 @@ def extract_tool_uses(message: OutputMessage) -> list[tuple[str, ToolUse]]:
 
 async def use_tools(tool_uses_by_parent: list[tuple[str, ToolUse]], messages: Sequence[Message], tools: Sequence[Tool],
                     iteration: int, tool_execution_handler: ToolExecutionHandler) -> dict[str, list[ToolResult]]:
+    return {parent_id: results async for parent_id, results in
+            use_tools_as_completed(tool_uses_by_parent, messages, tools, iteration, tool_execution_handler)}
+
+
+async def use_tools_as_completed(tool_uses_by_parent: list[tuple[str, ToolUse]], messages: Sequence[Message],
+                                 tools: Sequence[Tool], iteration: int, tool_execution_handler: ToolExecutionHandler,
+                                 ordered: bool = True) -> AsyncGenerator[tuple[str, list[ToolResult]], None]:
+    """
+    Yields (parent_id, results) pairs once all tools of a parent have finished. Results are listed in the order the
+    parent requested the tools.
+
+    By default the parents are yielded in the order they requested their tools, so the resulting history does not
+    depend on timing. A parent is still yielded as soon as it and all parents before it are done. With ordered=False
+    every parent is yielded the moment its own tools are done, so a fast group never waits for the slowest tool of
+    another one.
+    """
+    if not tool_uses_by_parent:
+        return
+
     tool_uses = [tu for _, tu in tool_uses_by_parent]
 
     tool_execution_ctx = ToolExecutionContext(
@@ -29,11 +50,110 @@ async def use_tools(tool_uses_by_parent: list[tuple[str, ToolUse]], messages: Se
         iteration=iteration
     )
 
-    tool_tasks = await tool_execution_handler(tool_execution_ctx)
-    tool_results = await asyncio.gather(*tool_tasks)
+    tool_tasks = list(await tool_execution_handler(tool_execution_ctx))
+    tool_uses_by_id = {tool_use['id']: tool_use for tool_use in tool_uses}
+
+    def owner(task: Awaitable[ToolResult]) -> ToolUse | None:
+        # Only awaitables bound to their tool use are attributed, guessing by position goes wrong as soon as
+        # middleware reorders, filters or wraps them
+        return tool_uses_by_id.get(tool_execution_ctx.tool_use_id_of(task))
+
+    def answered(task: Awaitable[ToolResult], result: ToolResult | None) -> ToolUse | None:
+        # The tool use a result answers, by its id or else (e.g. rewritten by middleware) by its bound tool use
+        if result is None:
+            return None
+        return tool_uses_by_id.get(result['tool_use_id']) or owner(task)
+
+    if len(tool_uses) == 1 and len(tool_tasks) == 1:
+        # Nothing to wait for concurrently, so the single execution is awaited directly instead of in a task
+        result = await _settle(owner(tool_tasks[0]), tool_tasks[0])
+        if answered(tool_tasks[0], result) is None:
+            result = None
+        yield tool_uses_by_parent[0][0], [_answer(tool_uses[0], result)]
+        return
+
+    tool_uses_of_parent: dict[str, list[ToolUse]] = defaultdict(list)
+    parent_by_id: dict[str, str] = {}
+    for parent_id, tool_use in tool_uses_by_parent:
+        tool_uses_of_parent[parent_id].append(tool_use)
+        parent_by_id[tool_use['id']] = parent_id
+    pending = {parent_id: len(parent_tool_uses) for parent_id, parent_tool_uses in tool_uses_of_parent.items()}
+
+    # Results are matched by id rather than position, so middleware may reorder or skip tool executions
+    results_by_id: dict[str, ToolResult] = {}
+    parent_order = list(tool_uses_of_parent)
+    # Completed parents that wait for an earlier parent, only used when ordered
+    ready: dict[str, list[ToolResult]] = {}
+    next_parent = 0
+
+    def complete(tool_use: ToolUse, result: ToolResult | None) -> list[tuple[str, list[ToolResult]]]:
+        # Returns the parents that can be yielded now that the tool use has its result
+        nonlocal next_parent
+        results_by_id[tool_use['id']] = _answer(tool_use, result)
+        parent_id = parent_by_id[tool_use['id']]
+        pending[parent_id] -= 1
+        if pending[parent_id]:
+            return []
+
+        del pending[parent_id]
+        results = [results_by_id[tu['id']] for tu in tool_uses_of_parent[parent_id]]
+        if not ordered:
+            return [(parent_id, results)]
 
-    results_by_parent = defaultdict(list)
-    for (parent_id, _), result in zip(tool_uses_by_parent, tool_results):
-        results_by_parent[parent_id].append(result)
+        ready[parent_id] = results
+        completed = []
+        while next_parent < len(parent_order) and parent_order[next_parent] in ready:
+            ready_parent_id = parent_order[next_parent]
+            next_parent += 1
+            completed.append((ready_parent_id, ready.pop(ready_parent_id)))
+        return completed
 
-    return results_by_parent
+    settled = (_settle(owner(task), task) for task in tool_tasks)
+    async for index, result in ToolExecutionContext.as_completed(settled):
+        tool_use = answered(tool_tasks[index], result)
+        if tool_use is None or tool_use['id'] in results_by_id:
+            if result is not None:
+                logger.warning(f'Dropping a tool result for unknown tool use {result["tool_use_id"]}')
+            continue
+
+        for parent_id, results in complete(tool_use, result):
+            yield parent_id, results
+
+    # Tool uses skipped by middleware or whose result could not be attributed still need a result, providers reject
+    # the next request otherwise. Parents are never yielded with only part of their results.
+    for tool_use in tool_uses:
+        if tool_use['id'] not in results_by_id:
+            for parent_id, results in complete(tool_use, None):
+                yield parent_id, results
+
+
+async def _settle(tool_use: ToolUse | None, task: Awaitable[ToolResult]) -> ToolResult | None:
+    # Errors that escape the handler are reported like any other failed tool, so one tool never aborts its siblings
+    try:
+        return await task
+    except Exception as e:
+        if tool_use is None:
+            logger.error('Error executing a tool that cannot be attributed to any tool use', exc_info=e)
+            return None
+        return _exception_result(tool_use, e)
+
+
+def _answer(tool_use: ToolUse, result: ToolResult | None) -> ToolResult:
+    # Every tool use needs a result with its id, providers reject the next request otherwise
+    if result is None:
+        return _exception_result(tool_use, RuntimeError(f'Tool {tool_use["name"]} produced no result'))
+    if result['tool_use_id'] == tool_use['id']:
+        return result
+
+    logger.warning(f'Tool result for {result["tool_use_id"]} answers tool use {tool_use["id"]}')
+    return {**result, 'tool_use_id': tool_use['id']}
+
+
+def _exception_result(tool_use: ToolUse, error: Exception) -> ToolResult:
+    logger.error(f'Error executing tool {tool_use["name"]} with params {tool_use["params"]}', exc_info=error)
+    return ToolResult(
+        type='tool_result',
+        tool_use_id=tool_use['id'],
+        result=str(error),
+        is_error=True
+    )
@@ -25,14 +25,23 @@ class MiddlewareStack[C, R]:
     def __init__(self, base_handler: MiddlewareHandler[C, R]):
         self._middleware: list[Middleware[C, R]] = []
         self._base_handler = base_handler
+        # The composed chain only depends on the registered middleware, so it is built once and reused per call
+        self._handler: MiddlewareHandler[C, R] | None = None
 
     def use(self, mw: Middleware[C, R] | Callable) -> None:
         if not isinstance(mw, Middleware):
             mw = _CallableMiddlewareAdapter(mw)
         self._middleware.append(mw)
+        self._handler = None
+
+    def clear(self) -> None:
+        self._middleware.clear()
+        self._handler = None
 
     def build(self) -> MiddlewareHandler[C, R]:
-        handler = self._base_handler
-        for mw in reversed(self._middleware):
-            handler = _MiddlewareWrapper(mw, handler)
-        return handler
+        if self._handler is None:
+            handler = self._base_handler
+            for mw in reversed(self._middleware):
+                handler = _MiddlewareWrapper(mw, handler)
+            self._handler = handler
+        return self._handler
@@ -1,15 +1,71 @@
 import json
-from typing import Any
+import math
+from typing import Any, Callable
 
 
-def serialize_tool_result(result: Any) -> str:
-    if isinstance(result, str):
-        return result
+def _json_dumps(value: Any) -> str:
+    # Compact separators produce the same output as orjson, e.g. for token estimates of tool schemas
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+try:
+    import orjson
+
+    # OPT_NON_STR_KEYS mirrors json.dumps, which converts int/float/bool keys instead of failing. Dates and
+    # dataclasses are left to the json fallback, so they are not encoded differently depending on whether orjson is
+    # installed. A few differences remain (e.g. NaN becomes null and UUIDs and enums are encoded natively).
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def _dumps(value: Any) -> str:
+        return orjson.dumps(value, option=_ORJSON_OPTIONS).decode()
+
+    # orjson.JSONDecodeError is a subclass of json.JSONDecodeError, so callers can handle both the same way
+    loads_json: Callable[[str | bytes], Any] = orjson.loads
+except ImportError:
+    _dumps = _json_dumps
+
+    loads_json: Callable[[str | bytes], Any] = json.loads
+
+dumps_json: Callable[[Any], str] = _dumps
+
+
+def _serialize_float(value: float) -> str:
+    # nan and inf have no JSON representation, let the encoder decide how to handle them
+    return repr(value) if math.isfinite(value) else _serialize_fallback(value)
 
-    if result is None:
-        return "null"
 
+def _serialize_fallback(value: Any) -> str:
     try:
-        return json.dumps(result, ensure_ascii=False)
+        return _dumps(value)
     except (TypeError, OverflowError):
-        return str(result)
+        # orjson.JSONEncodeError is a subclass of TypeError
+        if _dumps is _json_dumps:
+            return str(value)
+
+    try:
+        # orjson rejects some values json can still encode, e.g. integers beyond 64 bits
+        return _json_dumps(value)
+    except (TypeError, ValueError, OverflowError):
+        return str(value)
+
+
+# Trivial values are cheaper to format directly than through a JSON encoder. Dispatching on the exact type is a
+# single lookup and keeps subclasses (e.g. IntEnum) on the encoder path.
+_SERIALIZERS: dict[type, Callable[[Any], str]] = {
+    str: lambda value: value,
+    type(None): lambda _: "null",
+    bool: lambda value: "true" if value else "false",
+    int: repr,
+    float: _serialize_float,
+}
+
+
+def serialize_tool_result(result: Any) -> str:
+    serializer = _SERIALIZERS.get(type(result))
+    if serializer is not None:
+        return serializer(result)
+
+    if isinstance(result, str):
+        return result
+
+    return _serialize_fallback(result)
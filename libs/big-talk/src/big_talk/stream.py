@@ -1,8 +1,9 @@
+from contextlib import aclosing
 from dataclasses import dataclass
 from typing import TypeAlias, AsyncGenerator
 from uuid import uuid4
 
-from .loop import extract_tool_uses, use_tools
+from .loop import extract_tool_uses, use_tools_as_completed
 from .tool_execution import ToolExecutionHandler
 from .middleware import MiddlewareHandler, Middleware, MiddlewareStack
 from .stream_iteration import StreamIterationContext, StreamContextBase, StreamIterationHandler
@@ -14,6 +15,8 @@ class StreamContext(StreamContextBase):
     max_iterations: int
     _stream_iteration_handler: StreamIterationHandler
     _tool_execution_handler: ToolExecutionHandler
+    # Drops assistant deltas so consumers only receive complete messages (aggregates, tool and app messages)
+    only_aggregates: bool = False
 
 
 StreamHandler: TypeAlias = MiddlewareHandler[StreamContext, AsyncGenerator[Message, None]]
@@ -29,38 +32,40 @@ class BaseStreamHandler(StreamHandler):
         for iteration in range(ctx.max_iterations):
             # noinspection PyProtectedMember
             stream_ctx = StreamIterationContext(model=ctx.model, tools=ctx.tools, messages=current_history,
-                                                _provider_resolver=ctx._provider_resolver, iteration=iteration)
+                                                _provider_resolver=ctx._provider_resolver, iteration=iteration,
+                                                only_aggregates=ctx.only_aggregates)
 
             tool_uses_by_parent: list[tuple[str, ToolUse]] = []
             # noinspection PyProtectedMember
             async for message in ctx._stream_iteration_handler(stream_ctx, **kwargs):
-                yield message
-
-                is_app_message = message['role'] == 'app'
-                if not is_app_message and not message.get('is_aggregate'):
-                    continue
-
-                current_history.append(message)
-
-                if is_app_message:
-                    continue
-
-                tool_uses_by_parent.extend(extract_tool_uses(message))
+                match message:
+                    case {'role': 'app'}:
+                        yield message
+                        current_history.append(message)
+                    case {'is_aggregate': flag} if flag:
+                        yield message
+                        current_history.append(message)
+                        tool_uses_by_parent.extend(extract_tool_uses(message))
+                    case _ if not ctx.only_aggregates:
+                        yield message
 
             if not tool_uses_by_parent:
                 break
 
+            # Each group is passed on as soon as its tools and those of all earlier groups are done, so the history
+            # has the same, request ordered, tool messages as with send(). Closing the stream early cancels the tools
+            # that are still running.
             # noinspection PyProtectedMember
-            results_by_parent = await use_tools(tool_uses_by_parent, current_history, ctx.tools, iteration,
-                                                ctx._tool_execution_handler)
-
-            for parent_id, results in results_by_parent.items():
-                tool_result_message = ToolMessage(
-                    id=str(uuid4()),
-                    role='tool',
-                    content=results,
-                    parent_id=parent_id,
-                )
-
-                yield tool_result_message
-                current_history.append(tool_result_message)
+            tool_results = use_tools_as_completed(tool_uses_by_parent, current_history, ctx.tools, iteration,
+                                                  ctx._tool_execution_handler)
+            async with aclosing(tool_results):
+                async for parent_id, results in tool_results:
+                    tool_result_message = ToolMessage(
+                        id=str(uuid4()),
+                        role='tool',
+                        content=results,
+                        parent_id=parent_id,
+                    )
+
+                    yield tool_result_message
+                    current_history.append(tool_result_message)
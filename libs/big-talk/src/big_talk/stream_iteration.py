@@ -1,12 +1,16 @@
+import asyncio
 from abc import ABC
-from dataclasses import dataclass
-from typing import Callable, TypeAlias, AsyncGenerator, Any
+from contextlib import aclosing
+from dataclasses import dataclass, replace
+from typing import Callable, TypeAlias, AsyncGenerator, Any, Iterable, Self
 
 from .middleware import MiddlewareStack, MiddlewareHandler, Middleware
 from .tool import Tool
 from .llm import LLMProvider
 from .message import Message, OutputMessage
 
+DEFAULT_STREAM_BUFFER_SIZE = 16
+
 
 @dataclass
 class StreamContextBase(ABC):
@@ -18,10 +22,65 @@ class StreamContextBase(ABC):
     def get_llm_provider(self) -> tuple[LLMProvider, str]:
         return self._provider_resolver(self.model)
 
+    def prepend_messages(self, messages: Iterable[Message]) -> None:
+        """
+        Inserts messages in front of the current messages, e.g. to load earlier turns of a conversation. A new list is
+        assigned, as the current one may be shared (e.g. with the history of the stream loop) and must not change.
+        """
+        self.messages = [*messages, *self.messages]
+
+    def copy(self, **changes: Any) -> Self:
+        """
+        Returns a copy with its own messages and tools lists, so a branch can be changed without affecting this
+        context. Fields can be overridden via keyword arguments, e.g. ctx.copy(model='provider/other_model').
+        """
+        changes.setdefault('messages', list(self.messages))
+        changes.setdefault('tools', list(self.tools))
+        return replace(self, **changes)
+
+    @staticmethod
+    def branches() -> asyncio.TaskGroup:
+        """
+        Returns a task group to run independent branches (e.g. the same request against different models)
+        concurrently. Leaving the group waits for all remaining branches, use select_first to cancel the losers. As
+        with any task group, a branch that raises cancels the other branches.
+        """
+        return asyncio.TaskGroup()
+
+    @staticmethod
+    async def select_first[T](tasks: Iterable[asyncio.Task[T]]) -> T:
+        """
+        Returns the result of the first task that completes successfully and cancels all others. If every task fails,
+        their errors are raised together, if every task was cancelled, CancelledError is raised.
+        """
+        pending = set(tasks)
+        errors: list[BaseException] = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    errors.append(error)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if not errors:
+            raise asyncio.CancelledError()
+        # BaseExceptionGroup returns an ExceptionGroup if all errors are exceptions
+        raise BaseExceptionGroup('All branches failed', errors)
+
 
 @dataclass
 class StreamIterationContext(StreamContextBase):
     iteration: int
+    # Set when the consumer only wants complete messages, the provider deltas are then dropped before they reach
+    # any stream iteration middleware
+    only_aggregates: bool = False
 
 
 StreamIterationHandler: TypeAlias = MiddlewareHandler[StreamIterationContext, AsyncGenerator[OutputMessage, None]]
@@ -31,13 +90,72 @@ StreamIterationMiddleware: TypeAlias = Middleware[StreamIterationContext, AsyncG
 StreamIterationMiddlewareStack: TypeAlias = MiddlewareStack[StreamIterationContext, AsyncGenerator[OutputMessage, None]]
 
 
+_END = object()
+
+
+async def _buffered[T](source: AsyncGenerator[T, None], maxsize: int) -> AsyncGenerator[T, None]:
+    """
+    Drains source in a separate task into a bounded queue, so the source can produce the next items while the
+    consumer is still processing the previous ones. Order is preserved and errors are re-raised to the consumer.
+    """
+    # The queue itself is unbounded so the end marker can always be added without waiting, the slots bound how many
+    # items the source may produce ahead of the consumer
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(maxsize)
+    failure: BaseException | None = None
+
+    async def produce() -> None:
+        nonlocal failure
+        try:
+            async with aclosing(source):
+                async for item in source:
+                    await slots.acquire()
+                    queue.put_nowait(item)
+        except BaseException as e:
+            # Includes e.g. a CancelledError raised by the source itself, the consumer must not wait for it forever
+            failure = e
+        finally:
+            queue.put_nowait(_END)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (item := await queue.get()) is not _END:
+            slots.release()
+            yield item
+        if failure is not None:
+            raise failure
+    finally:
+        producer.cancel()
+
+
+async def _aggregates(source: AsyncGenerator[OutputMessage, None]) -> AsyncGenerator[OutputMessage, None]:
+    async with aclosing(source):
+        async for message in source:
+            if message.get('is_aggregate'):
+                yield message
+
+
 class BaseStreamIterationHandler(StreamIterationHandler):
+    def __init__(self, buffer_size: int | None = DEFAULT_STREAM_BUFFER_SIZE):
+        if buffer_size is not None and buffer_size < 1:
+            raise ValueError(f'Invalid buffer_size: {buffer_size}. Expected a positive number or None.')
+        # Buffering lets the provider keep reading from the network while middleware handles earlier messages.
+        # None streams unbuffered, so the provider only advances when the next message is requested.
+        self._buffer_size = buffer_size
+
     async def __call__(self, ctx: StreamIterationContext, **kwargs: Any) -> AsyncGenerator[OutputMessage, None]:
         provider, model_name = ctx.get_llm_provider()
-        async for message in provider.stream(
-                model=model_name,
-                messages=ctx.messages,
-                tools=ctx.tools,
-                **kwargs
-        ):
+        stream = provider.stream(
+            model=model_name,
+            messages=ctx.messages,
+            tools=ctx.tools,
+            **kwargs
+        )
+        if ctx.only_aggregates:
+            # Filtered ahead of the buffer, so discarded deltas never pass through the queue
+            stream = _aggregates(stream)
+        if self._buffer_size is not None:
+            stream = _buffered(stream, self._buffer_size)
+
+        async for message in stream:
             yield message
@@ -1,14 +1,161 @@
+import copy
 import inspect
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from types import UnionType
 from typing import Any, Callable, get_type_hints, get_origin, Literal, get_args, TypedDict, Sequence, Union, TypeAlias, \
-    Optional, is_typeddict, Annotated, overload, Iterable
+    Optional, is_typeddict, Annotated, overload, ForwardRef
 
 import docstring_parser
 
+from .serialization import dumps_json
+
+try:
+    import pydantic
+except ImportError:
+    pydantic = None
+
 logger = logging.getLogger(__name__)
 
+_TOOL_ATTRIBUTE = '__big_talk_tool__'
+
+
+def _needs_resolution(annotation: Any) -> bool:
+    if annotation is None or isinstance(annotation, (str, ForwardRef)):
+        return True
+
+    origin = get_origin(annotation)
+    if origin is Literal:
+        return False
+
+    args = get_args(annotation)
+    if origin is Annotated:
+        # Only the annotated type matters, the metadata may contain plain strings
+        args = args[:1]
+
+    return any(_needs_resolution(arg) for arg in args)
+
+
+def _get_type_hints(func: Callable) -> dict[str, Any]:
+    annotations = getattr(func, '__annotations__', None)
+    if annotations is None or any(_needs_resolution(v) for k, v in annotations.items() if k != 'return'):
+        return get_type_hints(func, include_extras=True)
+
+    # Nothing to evaluate, so skip the (comparatively expensive) resolution done by get_type_hints
+    return annotations
+
+
+@lru_cache(maxsize=256)
+def _get_typeddict_hints(t: type) -> dict[str, Any]:
+    # Shared TypedDicts are walked again for every tool that uses them, resolving their hints once is enough.
+    # get_type_hints handles inheritance and forward refs better than __annotations__.
+    return get_type_hints(t, include_extras=True)
+
+
+def _is_hidden_value(value: Any, hidden_value_set: frozenset | None, hidden_values: Sequence[Any]) -> bool:
+    if hidden_value_set is not None:
+        try:
+            return value in hidden_value_set
+        except TypeError:
+            # Unhashable defaults (e.g. lists) cannot be looked up in the set
+            pass
+
+    return value in hidden_values
+
+
+class _ReadOnlyDict(dict):
+    """
+    A dict that cannot be changed, so a tool can be shared between conversations without one of them affecting the
+    others. Being a dict, it is serialized like one (json, copy, pickle). Copies are plain, changeable dicts.
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError(f'{type(self).__name__} is read-only')
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class _ReadOnlyList(list):
+    """The list counterpart of _ReadOnlyDict."""
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = append = extend = insert = pop = remove = clear = sort = \
+        reverse = _ReadOnlyDict._read_only
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+# Bounded, so tools created from ever new descriptions cannot grow it without limit
+_SCHEMA_INTERN_LIMIT = 1024
+_SCHEMA_INTERN: dict[tuple, _ReadOnlyDict] = {}
+
+
+def _read_only_schema(schema: Any) -> Any:
+    if isinstance(schema, list):
+        return _ReadOnlyList(_read_only_schema(item) for item in schema)
+    if not isinstance(schema, dict):
+        return schema
+
+    read_only = _ReadOnlyDict({k: _read_only_schema(v) for k, v in schema.items()})
+    # Leaf schemas like {'type': 'string'} repeat across tools, so a single read-only instance is shared for each
+    if not read_only or not all(isinstance(v, (str, int, float, bool)) for v in read_only.values()):
+        return read_only
+
+    # The value type is part of the key so that e.g. True and 1 do not collapse into the same schema
+    key = tuple((k, type(v), v) for k, v in read_only.items())
+    interned = _SCHEMA_INTERN.get(key)
+    if interned is not None:
+        return interned
+    if len(_SCHEMA_INTERN) < _SCHEMA_INTERN_LIMIT:
+        _SCHEMA_INTERN[key] = read_only
+    return read_only
+
+
+def _property(type_: str, description: str | None, **fields: Any) -> dict[str, Any]:
+    # Leave out empty descriptions instead of carrying a None value through every schema
+    if description is None:
+        return {'type': type_, **fields}
+    return {'type': type_, 'description': description, **fields}
+
+
+def _is_pydantic_model(t: Any) -> bool:
+    return pydantic is not None and isinstance(t, type) and issubclass(t, pydantic.BaseModel)
+
+
+_TYPE_ADAPTERS: dict[Any, Any] = {}
+
+
+def _type_adapter_schema(t: Any) -> dict[str, Any] | None:
+    # Types without a schema of our own are left to pydantic, if it is installed
+    if pydantic is None:
+        return None
+
+    try:
+        adapter = _TYPE_ADAPTERS.get(t)
+    except TypeError:
+        # Unhashable annotations are not cached
+        adapter = None
+
+    try:
+        if adapter is None:
+            adapter = pydantic.TypeAdapter(t)
+            try:
+                _TYPE_ADAPTERS[t] = adapter
+            except TypeError:
+                pass
+        schema = adapter.json_schema()
+    except pydantic.PydanticUserError:
+        return None
+
+    # An empty schema (e.g. for object) accepts anything, which is as unsupported as Any
+    return schema or None
+
 
 class Property(TypedDict):
     type: Literal['string', 'integer', 'boolean', 'number', 'array', 'object']
@@ -47,13 +194,36 @@ ToolParameters = TypedDict('ToolParameters', {
 }, total=False)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Tool:
     name: str
     description: str
-    parameters: ToolParameters
+    # The dict fields are read-only but not hashable, so tools are hashed by the remaining fields
+    parameters: ToolParameters = field(hash=False)
     func: Callable
-    metadata: dict[str, Any]
+    metadata: dict[str, Any] = field(default_factory=dict, hash=False)
+    hidden_params: dict[str, Any] = field(default_factory=dict, hash=False)
+    safe: bool = False
+    is_async: bool = field(init=False, repr=False)
+    _parameters_json: str | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Tools are shared (e.g. Tool.from_func returns the same tool for a function every time), so they hold
+        # read-only copies. Changes to the dicts passed in or made through one user of the tool cannot leak to others.
+        object.__setattr__(self, 'parameters', _read_only_schema(self.parameters))
+        object.__setattr__(self, 'metadata', _ReadOnlyDict(self.metadata))
+        object.__setattr__(self, 'hidden_params', _ReadOnlyDict(self.hidden_params))
+        object.__setattr__(self, 'is_async', inspect.iscoroutinefunction(self.func))
+
+    @property
+    def parameters_json(self) -> str:
+        """
+        The parameters schema encoded as JSON. Encoded on first access and reused afterwards, as the schema cannot
+        change once the tool exists.
+        """
+        if self._parameters_json is None:
+            object.__setattr__(self, '_parameters_json', dumps_json(self.parameters))
+        return self._parameters_json
 
     @classmethod
     def from_func(cls,
@@ -62,20 +232,39 @@ class Tool:
                   metadata: dict[str, Any] = None,
                   hidden_default_types: Sequence[type] = None,
                   hidden_default_values: Sequence[Any] = None,
+                  safe: bool = False,
                   **docstring_kwargs) -> 'Tool':
+        # Plain functions are usually converted again for every stream, so their tool is remembered on the function
+        cacheable = not (docstring_args or docstring_kwargs or metadata or hidden_default_types or hidden_default_values
+                         or safe)
+        if cacheable:
+            cached = getattr(func, _TOOL_ATTRIBUTE, None)
+            # functools.wraps copies __dict__, so a wrapper can carry the tool of the function it wraps
+            if type(cached) is cls and cached.func is func:
+                return cached
+
         if not metadata:
             metadata = {}
 
         if hidden_default_types:
             hidden_default_types = tuple(hidden_default_types)
 
+        hidden_value_set: frozenset | None = None
+        if hidden_default_values:
+            try:
+                hidden_value_set = frozenset(hidden_default_values)
+            except TypeError:
+                # At least one value is unhashable, so we stick to scanning the sequence
+                pass
+
         doc = docstring_parser.parse(inspect.getdoc(func) or '')
 
         description = doc.short_description or ''
         if doc.long_description:
             description += f'\n\n{doc.long_description}'
 
-        if docstring_args or docstring_kwargs:
+        # Without any braces format() would return the description unchanged, so skip it and its error handling
+        if (docstring_args or docstring_kwargs) and ('{' in description or '}' in description):
             try:
                 description = description.format(*docstring_args, **docstring_kwargs)
             except (ValueError, KeyError, IndexError):
@@ -87,27 +276,30 @@ class Tool:
         param_docs = {p.arg_name: p.description for p in doc.params}
 
         sig = inspect.signature(func)
-        type_hints = get_type_hints(func, include_extras=True)
+        type_hints = _get_type_hints(func)
 
         required: list[str] = []
         properties: dict[str, ToolParametersProperty] = {}
+        hidden_params: dict[str, Any] = {}
 
         for param_name, param in sig.parameters.items():
             if param_name in ('self', 'cls'):
                 continue
 
-            is_required = param.default == inspect.Parameter.empty
+            is_required = param.default is inspect.Parameter.empty
             if not is_required:
-                if hidden_default_values and param.default in hidden_default_values:
-                    continue
-                if hidden_default_types and isinstance(param.default, hidden_default_types):
+                is_hidden_value = hidden_default_values and _is_hidden_value(param.default, hidden_value_set,
+                                                                             hidden_default_values)
+                is_hidden_type = hidden_default_types and isinstance(param.default, hidden_default_types)
+                if is_hidden_value or is_hidden_type:
+                    hidden_params[param_name] = param.default
                     continue
 
             python_type = type_hints.get(param_name, Any)
             json_schema = cls._schema_from_type(python_type)
 
-            if param_name in param_docs and param_docs[param_name]:
-                param_description = param_docs[param_name]
+            param_description = param_docs.get(param_name)
+            if param_description:
                 if json_schema.get('description'):
                     json_schema['description'] += f'\n\n{param_description}'
                 else:
@@ -128,9 +320,19 @@ class Tool:
         if defs:
             raw_parameters['$defs'] = defs
 
-        parameters = ToolParameters(**cls._sanitize_schema(raw_parameters))
+        parameters: ToolParameters = cls._sanitize_schema(raw_parameters)
 
-        return cls(name=func.__name__, description=description, parameters=parameters, func=func, metadata=metadata)
+        new_tool = cls(name=func.__name__, description=description, parameters=parameters, func=func,
+                       metadata=metadata, hidden_params=hidden_params, safe=safe)
+
+        if cacheable:
+            try:
+                setattr(func, _TOOL_ATTRIBUTE, new_tool)
+            except (AttributeError, TypeError):
+                # e.g. bound methods and builtins do not accept attributes
+                pass
+
+        return new_tool
 
     @staticmethod
     def _hoist_definitions(schema: dict[str, Any]) -> dict[str, Any]:
@@ -179,90 +381,118 @@ class Tool:
 
             origin = get_origin(t)
 
-        schema: ToolParametersProperty | None = None
+        # Generic aliases dispatch on their origin (e.g. list[str] on list), everything else on the type itself
+        try:
+            handler = _SCHEMA_HANDLERS.get(t if origin is None else origin)
+        except TypeError:
+            # Annotations that are neither types nor generic aliases may not be hashable
+            handler = None
+
+        if handler is not None:
+            schema = handler(t, description)
+        elif _is_pydantic_model(t):
+            schema = _pydantic_model_schema(t, description)
+        elif is_typeddict(t):
+            schema = _typeddict_schema(t, description)
+        else:
+            # Any (also used for missing annotations) stays unsupported, a parameter without a type cannot be filled
+            # in reliably
+            schema = _type_adapter_schema(t) if t is not Any else None
+            if schema is not None:
+                schema.pop('title', None)
+                schema['description'] = description or schema.get('description', '')
 
-        # Handle Optional (e.g. Optional[str] or Union[str, None])
-        if origin is Union or origin is UnionType:
-            args = get_args(t)
-            non_none_args = [a for a in args if a is not type(None)]
-            if len(non_none_args) == 1:
-                schema = Tool._schema_from_type(non_none_args[0])
-            else:
-                schema = {
-                    'anyOf': [Tool._schema_from_type(a) for a in non_none_args]
-                }
-            schema['description'] = description or schema.get('description', '')
-
-        # Pydantic support
-        elif hasattr(t, 'model_json_schema') and callable(t.model_json_schema):
-            # noinspection PyTypeChecker
-            schema = t.model_json_schema()
-            schema.pop('title', None)
-            schema['description'] = description or schema.get('description', '')
-
-        # Handle basic types
-        elif t == str:
-            schema = Property(type='string', description=description)
-        elif t == int:
-            schema = Property(type='integer', description=description)
-        elif t == float:
-            schema = Property(type='number', description=description)
-        elif t == bool:
-            schema = Property(type='boolean', description=description)
-
-        # Handle Literals
-        elif origin is Literal:
-            schema = EnumProperty(type='string', enum=list(get_args(t)), description=description)
-
-        # Handle Lists (e.g. list[str])
-        elif t == list or origin == list:
-            args = get_args(t)
-            item_schema = Tool._schema_from_type(args[0]) if args else {}
-            schema = ArrayProperty(type='array', items=item_schema, description=description)
+        if schema is None:
+            raise NotImplementedError(f'Type {t} (origin: {origin}) is not supported.')
 
-        # Handle TypedDict
-        elif is_typeddict(t):
-            properties = {}
+        return schema
 
-            # get_type_hints handles inheritance and forward refs better than __annotations__
-            hints = get_type_hints(t, include_extras=True)
 
-            for key, value in hints.items():
-                properties[key] = Tool._schema_from_type(value)
+def _primitive_schema(type_: str) -> Callable[[Any, str | None], ToolParametersProperty]:
+    def schema(_: Any, description: str | None) -> ToolParametersProperty:
+        return _property(type_, description)
 
-            required_keys = set(getattr(t, "__required_keys__", []))
-            required = []
-            for key in required_keys:
-                val_type = hints[key]
+    return schema
 
-                while get_origin(val_type) is Annotated:
-                    val_type = get_args(val_type)[0]
 
-                origin = get_origin(val_type)
-                args = get_args(val_type)
+def _union_schema(t: Any, description: str | None) -> ToolParametersProperty:
+    # Handles Optional (e.g. Optional[str] or Union[str, None]) as well as real unions
+    non_none_args = [a for a in get_args(t) if a is not type(None)]
+    if len(non_none_args) == 1:
+        schema = Tool._schema_from_type(non_none_args[0])
+    else:
+        schema = {
+            'anyOf': [Tool._schema_from_type(a) for a in non_none_args]
+        }
+    schema['description'] = description or schema.get('description', '')
+    return schema
 
-                # Check if the type allows None (Union[..., None] or ... | None)
-                is_nullable = (origin is Union or origin is UnionType) and type(None) in args
 
-                # Only keep it required if it is NOT nullable
-                if not is_nullable:
-                    required.append(key)
+def _literal_schema(t: Any, description: str | None) -> ToolParametersProperty:
+    return _property('string', description, enum=list(get_args(t)))
 
-            schema = ObjectProperty(
-                type='object',
-                properties=properties,
-                required=required,
-                description=description
-            )
 
-        # Fallback for dicts or complex types (treat as generic object)
-        elif t == dict or origin == dict:
-            schema = DictionaryProperty(type='object', additionalProperties=True, description=description)
+def _list_schema(t: Any, description: str | None) -> ToolParametersProperty:
+    args = get_args(t)
+    item_schema = Tool._schema_from_type(args[0]) if args else {}
+    return _property('array', description, items=item_schema)
 
-        if schema is None:
-            raise NotImplementedError(f'Type {t} (origin: {origin}) is not supported.')
 
-        return schema
+def _dict_schema(_: Any, description: str | None) -> ToolParametersProperty:
+    # Dicts are treated as generic objects
+    return _property('object', description, additionalProperties=True)
+
+
+@lru_cache(maxsize=256)
+def _model_json_schema(model: type) -> dict[str, Any]:
+    # noinspection PyUnresolvedReferences
+    return model.model_json_schema()
+
+
+def _pydantic_model_schema(t: Any, description: str | None) -> ToolParametersProperty:
+    # Generating the schema walks the whole model, the cached result is copied since hoisting the $defs mutates it
+    schema = copy.deepcopy(_model_json_schema(t))
+    schema.pop('title', None)
+    schema['description'] = description or schema.get('description', '')
+    return schema
+
+
+def _typeddict_schema(t: Any, description: str | None) -> ToolParametersProperty:
+    hints = _get_typeddict_hints(t)
+    properties = {key: Tool._schema_from_type(value) for key, value in hints.items()}
+
+    required = []
+    for key in getattr(t, "__required_keys__", []):
+        val_type = hints[key]
+
+        while get_origin(val_type) is Annotated:
+            val_type = get_args(val_type)[0]
+
+        origin = get_origin(val_type)
+        args = get_args(val_type)
+
+        # Check if the type allows None (Union[..., None] or ... | None)
+        is_nullable = (origin is Union or origin is UnionType) and type(None) in args
+
+        # Only keep it required if it is NOT nullable
+        if not is_nullable:
+            required.append(key)
+
+    return _property('object', description, properties=properties, required=required)
+
+
+# Resolved with a single lookup per node instead of walking through a chain of comparisons
+_SCHEMA_HANDLERS: dict[Any, Callable[[Any, str | None], ToolParametersProperty]] = {
+    str: _primitive_schema('string'),
+    int: _primitive_schema('integer'),
+    float: _primitive_schema('number'),
+    bool: _primitive_schema('boolean'),
+    Union: _union_schema,
+    UnionType: _union_schema,
+    Literal: _literal_schema,
+    list: _list_schema,
+    dict: _dict_schema,
+}
 
 
 @overload
@@ -274,6 +504,7 @@ def tool(*docstring_args,
          metadata: dict[str, Any] = None,
          hidden_default_types: Sequence[type] = None,
          hidden_default_values: Sequence[Any] = None,
+         safe: bool = False,
          **docstring_kwargs) -> Callable[[Callable], Tool]: ...
 
 
@@ -282,6 +513,7 @@ def tool(func: Callable | Any = None,
          metadata: dict[str, Any] = None,
          hidden_default_types: Sequence[type] = None,
          hidden_default_values: Sequence[Any] = None,
+         safe: bool = False,
          **kwargs) -> Tool | Callable[[Callable], Tool]:
     """
     Decorator to convert a function into a BigTalk Tool.
@@ -292,6 +524,8 @@ def tool(func: Callable | Any = None,
 
       @tool(metadata={'scope': 'read'})
       def my_func(): ...
+
+    Pass safe=True for tools that never raise to skip the error handling around their execution.
     """
     is_factory = func is None or not callable(func)
 
@@ -302,9 +536,9 @@ def tool(func: Callable | Any = None,
 
         def wrapper(f: Callable) -> Tool:
             return Tool.from_func(f, metadata=metadata, hidden_default_values=hidden_default_values,
-                                  hidden_default_types=hidden_default_types, *format_args, **kwargs)
+                                  hidden_default_types=hidden_default_types, safe=safe, *format_args, **kwargs)
 
         return wrapper
 
     return Tool.from_func(func, metadata=metadata, hidden_default_values=hidden_default_values,
-                          hidden_default_types=hidden_default_types, *args, **kwargs)
+                          hidden_default_types=hidden_default_types, safe=safe, *args, **kwargs)
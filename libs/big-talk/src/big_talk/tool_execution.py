@@ -1,8 +1,8 @@
-import inspect
+import asyncio
 import json
 import logging
-from dataclasses import dataclass
-from typing import Sequence, TypeAlias, Iterable, Awaitable, Any
+from dataclasses import dataclass, field
+from typing import Sequence, TypeAlias, Iterable, Awaitable, Any, AsyncGenerator, Mapping, Callable
 
 from .message import ToolUse, Message, ToolResult
 from .middleware import MiddlewareStack, MiddlewareHandler, Middleware
@@ -10,66 +10,222 @@ from .tool import Tool
 
 logger = logging.getLogger(__name__)
 
+# Copying a prebuilt dict is cheaper than building every ToolResult from keyword arguments
+_SUCCESS_RESULT: ToolResult = ToolResult(type='tool_result', tool_use_id='', result=None, is_error=False)
+_ERROR_RESULT: ToolResult = ToolResult(type='tool_result', tool_use_id='', result=None, is_error=True)
 
-@dataclass
+
+@dataclass(slots=True)
 class ToolExecutionContext:
     iteration: int
     tool_uses: Sequence[ToolUse]
     tools: Sequence[Tool]
     messages: Sequence[Message]
+    _tools_by_name: Mapping[str, Tool] = field(init=False, repr=False, compare=False)
+    _tool_use_ids: dict[Awaitable[ToolResult], str] = field(default_factory=dict, init=False, repr=False,
+                                                            compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name == 'tools':
+            object.__setattr__(self, '_tools_by_name', {tool.name: tool for tool in value})
+
+    @property
+    def tools_by_name(self) -> Mapping[str, Tool]:
+        """
+        The available tools keyed by name. Built once when the tools are assigned, so lookups do not scan the tools.
+        Middleware that changes the tools should assign a new sequence, changes made in place are not picked up.
+        """
+        return self._tools_by_name
+
+    def bind[A: Awaitable[ToolResult]](self, tool_use_id: str, execution: A) -> A:
+        """
+        Records which tool use an awaitable answers, so an error escaping it is reported for the right tool use even
+        if middleware reorders or filters the awaitables. Middleware that wraps executions can bind its wrappers too.
+        """
+        self._tool_use_ids[execution] = tool_use_id
+        return execution
+
+    def tool_use_id_of(self, execution: Awaitable[ToolResult]) -> str | None:
+        """Returns the id of the tool use the awaitable was bound to, if any."""
+        try:
+            return self._tool_use_ids.get(execution)
+        except TypeError:
+            # Unhashable awaitables cannot have been bound
+            return None
+
+    @staticmethod
+    async def as_completed(tasks: Iterable[Awaitable[ToolResult]], buffer_size: int | None = None) \
+            -> AsyncGenerator[tuple[int, ToolResult], None]:
+        """
+        Yields (index, result) pairs in the order the tool executions finish, so middleware can process results
+        without waiting for the slowest tool. buffer_size limits how many pending awaitables are started at once.
+        """
+        if buffer_size is not None and buffer_size < 1:
+            raise ValueError(f'Invalid buffer_size: {buffer_size}. Expected a positive number or None.')
+
+        async def indexed(index: int, task: Awaitable[ToolResult]) -> tuple[int, ToolResult]:
+            return index, await task
+
+        remaining = iter(enumerate(tasks))
+        running: set[asyncio.Future[tuple[int, ToolResult]]] = set()
+
+        def fill():
+            while buffer_size is None or len(running) < buffer_size:
+                next_task = next(remaining, None)
+                if next_task is None:
+                    return
+                running.add(asyncio.ensure_future(indexed(*next_task)))
+
+        try:
+            fill()
+            while running:
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                fill()
+        finally:
+            for future in running:
+                future.cancel()
 
 
 ToolExecutionHandler: TypeAlias = MiddlewareHandler[ToolExecutionContext, Awaitable[Iterable[Awaitable[ToolResult]]]]
 
 ToolExecutionMiddleware: TypeAlias = Middleware[ToolExecutionContext, Awaitable[Iterable[Awaitable[ToolResult]]]]
 
-ToolExecutionMiddlewareStack: TypeAlias = MiddlewareStack[
-    ToolExecutionContext, Awaitable[Iterable[Awaitable[ToolResult]]]]
+ToolResultProcessor: TypeAlias = Callable[[ToolResult], ToolResult]
 
 
 class BaseToolExecutionHandler(ToolExecutionHandler):
+    def __init__(self, max_concurrency: int | None = None, run_sync_in_thread: bool = True):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError(f'Invalid max_concurrency: {max_concurrency}. Expected a positive number or None.')
+        self._max_concurrency = max_concurrency
+        # Running sync tools in a worker thread keeps them from blocking the event loop and lets blocking I/O overlap.
+        # CPU bound tools gain nothing while holding the GIL, so this can be turned off to run them inline instead.
+        self._run_sync_in_thread = run_sync_in_thread
+        self._post_processors: list[ToolResultProcessor] = []
+
     async def __call__(self, context: ToolExecutionContext) -> Iterable[Awaitable[ToolResult]]:
-        tool_map = {tool.name: tool for tool in context.tools}
+        if not context.tool_uses:
+            return []
+
+        tool_map = context.tools_by_name
+        semaphore = asyncio.Semaphore(self._max_concurrency) if self._max_concurrency else None
+        # A single tool has nothing to overlap with, so it is not worth the overhead of a task
+        schedule = len(context.tool_uses) > 1
+        loop = asyncio.get_running_loop()
 
         tasks: list[Awaitable[ToolResult]] = []
         for tool_use in context.tool_uses:
-            if tool_use['name'] not in tool_map:
-                tasks.append(self._error_result(tool_use['id'], f'Tool {tool_use["name"]} not found'))
+            name = tool_use['name']
+            tool = tool_map.get(name)
+            if tool is None:
+                tasks.append(context.bind(tool_use['id'], self._error_result(tool_use['id'], f'Tool {name} not found')))
+                continue
+
+            # Tools can opt in individually with metadata={'sync_inline': True}, e.g. for trivial computations
+            if not tool.is_async and (not self._run_sync_in_thread or tool.metadata.get('sync_inline')):
+                # Sync tools run to completion right here, so hand out an already resolved future. Errors that escape
+                # (e.g. from safe tools) are stored on the future like for any other task instead of aborting the call.
+                future = loop.create_future()
+                try:
+                    future.set_result(self._post_process(self._run_sync_tool(tool, tool_use)))
+                except Exception as e:
+                    future.set_exception(e)
+                tasks.append(context.bind(tool_use['id'], future))
                 continue
 
-            tool = tool_map[tool_use['name']]
-            tasks.append(self._execute_tool(tool, tool_use))
+            execution = self._execute_async_tool(tool, tool_use) if tool.is_async \
+                else self._execute_threaded_tool(tool, tool_use)
+            if not schedule:
+                tasks.append(context.bind(tool_use['id'], execution))
+                continue
+
+            # Schedule right away so independent tools overlap instead of running one after another. Starting eagerly
+            # lets tools that never suspend finish in line instead of waiting for the next event loop iteration.
+            if semaphore is not None:
+                execution = self._limit(semaphore, execution)
+            tasks.append(context.bind(tool_use['id'], asyncio.Task(execution, loop=loop, eager_start=True)))
 
         return tasks
 
     @staticmethod
-    async def _error_result(tool_use_id: str, error_message: str) -> ToolResult:
-        return ToolResult(
-            type='tool_result',
-            tool_use_id=tool_use_id,
-            result=error_message,
-            is_error=True
-        )
+    async def _limit(semaphore: asyncio.Semaphore, execution: Awaitable[ToolResult]) -> ToolResult:
+        async with semaphore:
+            return await execution
+
+    def _post_process(self, result: ToolResult) -> ToolResult:
+        for processor in self._post_processors:
+            result = processor(result)
+        return result
+
+    async def _error_result(self, tool_use_id: str, error_message: str) -> ToolResult:
+        tool_result = _ERROR_RESULT.copy()
+        tool_result['tool_use_id'] = tool_use_id
+        tool_result['result'] = error_message
+        return self._post_process(tool_result)
+
+    async def _execute_async_tool(self, tool: Tool, tool_use: ToolUse) -> ToolResult:
+        if tool.safe:
+            return self._post_process(self._successful_result(tool_use, await tool.func(**tool_use['params'])))
+
+        try:
+            result = await tool.func(**tool_use['params'])
+        except Exception as e:
+            return self._post_process(self._failed_result(tool, tool_use, e))
+
+        return self._post_process(self._successful_result(tool_use, result))
+
+    async def _execute_threaded_tool(self, tool: Tool, tool_use: ToolUse) -> ToolResult:
+        # Post processors run back on the event loop, not in the worker thread
+        return self._post_process(await asyncio.to_thread(self._run_sync_tool, tool, tool_use))
 
     @staticmethod
-    async def _execute_tool(tool: Tool, tool_use: ToolUse) -> ToolResult:
+    def _run_sync_tool(tool: Tool, tool_use: ToolUse) -> ToolResult:
+        if tool.safe:
+            return BaseToolExecutionHandler._successful_result(tool_use, tool.func(**tool_use['params']))
+
         try:
-            if inspect.iscoroutinefunction(tool.func):
-                result = await tool.func(**tool_use['params'])
-            else:
-                result = tool.func(**tool_use['params'])
-
-            return ToolResult(
-                type='tool_result',
-                tool_use_id=tool_use['id'],
-                result=result,
-                is_error=False
-            )
+            result = tool.func(**tool_use['params'])
         except Exception as e:
-            logger.exception(f'Error executing tool {tool.name} with params {tool_use["params"]}')
-            return ToolResult(
-                type='tool_result',
-                tool_use_id=tool_use['id'],
-                result=str(e),
-                is_error=True
-            )
+            return BaseToolExecutionHandler._failed_result(tool, tool_use, e)
+
+        return BaseToolExecutionHandler._successful_result(tool_use, result)
+
+    @staticmethod
+    def _successful_result(tool_use: ToolUse, result: Any) -> ToolResult:
+        tool_result = _SUCCESS_RESULT.copy()
+        tool_result['tool_use_id'] = tool_use['id']
+        tool_result['result'] = result
+        return tool_result
+
+    @staticmethod
+    def _failed_result(tool: Tool, tool_use: ToolUse, error: Exception) -> ToolResult:
+        logger.exception(f'Error executing tool {tool.name} with params {tool_use["params"]}')
+        tool_result = _ERROR_RESULT.copy()
+        tool_result['tool_use_id'] = tool_use['id']
+        tool_result['result'] = str(error)
+        return tool_result
+
+
+class ToolExecutionMiddlewareStack(MiddlewareStack[ToolExecutionContext, Awaitable[Iterable[Awaitable[ToolResult]]]]):
+    def __init__(self, base_handler: BaseToolExecutionHandler):
+        super().__init__(base_handler)
+
+    def post_process(self, processor: ToolResultProcessor) -> ToolResultProcessor:
+        """
+        Registers a function that transforms every tool result the base handler creates, including the errors it
+        catches, as soon as the tool has finished. Unlike a middleware that wraps each execution in another coroutine,
+        processors are called right where the result is created. They run in registration order and before any
+        middleware sees the result. Errors that escape the handler (e.g. from safe tools or middleware) are turned
+        into results later on and are not passed to the processors.
+        """
+        # noinspection PyProtectedMember
+        self._base_handler._post_processors.append(processor)
+        return processor
+
+    def clear(self) -> None:
+        super().clear()
+        # noinspection PyProtectedMember
+        self._base_handler._post_processors.clear()
@@ -1,13 +1,40 @@
+import asyncio
+
 import pytest
 
 from big_talk import BigTalk, Message, UserMessage
-from tests.helpers import TestLLMProvider
+from tests.helpers import TestLLMProvider, VirtualClock
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "timing: asserts on wall clock durations, deselect with -m 'not timing' on "
+                                       "loaded runners")
+    config.addinivalue_line("markers", "slow: waits in real time, deselect with -m 'not slow'")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """
+    Runs the async tests on uvloop when it is installed, the suite is dominated by small event loop hops. The hook
+    replaces the deprecated event loop policies and is only called by pytest-asyncio 1.4 and later.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+
+    return {"uvloop": uvloop.new_event_loop}
+
+
+# All tests share one instance (and one session-scoped event loop), reset() makes it look fresh to every test
+_BT = BigTalk()
 
 
 @pytest.fixture
 def bigtalk():
-    """Returns a fresh BigTalk instance for every test."""
-    return BigTalk()
+    """Returns a BigTalk instance without providers or middleware for every test."""
+    _BT.reset()
+    return _BT
 
 
 @pytest.fixture
@@ -23,3 +50,11 @@ def create_provider():
 @pytest.fixture
 def simple_message():
     return UserMessage(role="user", content="Hello", id="msg-1")
+
+
+@pytest.fixture
+def virtual_clock(monkeypatch):
+    """Replaces asyncio.sleep with a virtual clock, assert on virtual_clock.now instead of measuring real time."""
+    clock = VirtualClock()
+    monkeypatch.setattr(asyncio, "sleep", clock.sleep)
+    return clock
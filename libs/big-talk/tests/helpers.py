@@ -1,4 +1,7 @@
 import asyncio
+import heapq
+import itertools
+from collections import deque
 from typing import AsyncGenerator, Sequence
 from big_talk.llm import LLMProvider
 from big_talk import Message, AssistantMessage, Text, Tool
@@ -6,8 +9,17 @@ from big_talk.stream_iteration import StreamIterationContext, StreamIterationHan
 
 
 class MockToolProvider(LLMProvider):
+    __slots__ = ('responses',)
+
     def __init__(self, responses: list[AssistantMessage]):
-        self.responses = responses
+        # Every stream call takes the next response, a queue keeps that order even for concurrent calls
+        self.responses: asyncio.Queue[AssistantMessage] = asyncio.Queue()
+        for response in responses:
+            self.responses.put_nowait(response)
+
+    def push(self, response: AssistantMessage) -> None:
+        """Queues another response, e.g. while a stream is already in flight."""
+        self.responses.put_nowait(response)
 
     async def count_tokens(self, model: str, messages: Sequence[Message], **kwargs) -> int:
         pass
@@ -16,18 +28,39 @@ class MockToolProvider(LLMProvider):
         pass
 
     async def stream(self, model: str, messages: Sequence[Message], **kwargs) -> AsyncGenerator[AssistantMessage, None]:
-        if self.responses:
-            yield self.responses.pop(0)
+        try:
+            response = self.responses.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        yield response
 
     async def close(self): pass
 
 
+def _response_message(content: str) -> AssistantMessage:
+    return AssistantMessage(role="assistant",
+                            content=[Text(type="text", text=content)],
+                            id="test-id",
+                            parent_id="parent-id",
+                            is_aggregate=True)
+
+
+_DEFAULT_RESPONSES = ("hello", "world")
+# Streamed messages are only read by the tests, so every provider can yield the same default instances
+_DEFAULT_RESPONSE_MESSAGES = tuple(_response_message(content) for content in _DEFAULT_RESPONSES)
+
+
 class TestLLMProvider(LLMProvider):
-    def __init__(self, name: str, responses: list[str] = None, fail_on_stream: bool = False):
+    def __init__(self, name: str, responses: list[str] = None, fail_on_stream: bool = False,
+                 simulate_latency: float = 0.0, stream_calls_capacity: int = 64):
         self.name = name
-        self.responses = responses or ["hello", "world"]
+        self.responses = responses or list(_DEFAULT_RESPONSES)
+        self._response_messages = tuple(_response_message(content) for content in responses) if responses \
+            else _DEFAULT_RESPONSE_MESSAGES
         self.fail_on_stream = fail_on_stream
-        self.stream_calls: list[dict] = []
+        self.simulate_latency = simulate_latency
+        # Bounded so long-running tests do not accumulate every call, only the most recent calls are kept
+        self.stream_calls: deque[dict] = deque(maxlen=stream_calls_capacity)
         self.close_called = False
 
     async def count_tokens(self, model: str, messages: Sequence[Message], **kwargs) -> int:
@@ -40,20 +73,18 @@ class TestLLMProvider(LLMProvider):
         # Store calls for verification
         self.stream_calls.append({
             "model": model,
-            "messages": list(messages),
+            # Slicing is a cheaper shallow copy than list() for the common case of a list or tuple
+            "messages": messages[:] if isinstance(messages, (list, tuple)) else list(messages),
             "kwargs": kwargs
         })
 
         if self.fail_on_stream:
             raise RuntimeError(f"Simulated failure in {self.name}")
 
-        for content in self.responses:
-            yield AssistantMessage(role="assistant",
-                                   content=[Text(type="text", text=content)],
-                                   id="test-id",
-                                   parent_id="parent-id",
-                                   is_aggregate=True)
-            await asyncio.sleep(0.001)
+        for message in self._response_messages:
+            yield message
+            if self.simulate_latency:
+                await asyncio.sleep(self.simulate_latency)
 
     async def close(self):
         self.close_called = True
@@ -79,3 +110,50 @@ class SpyMiddleware:
             yield msg
 
         self.call_log.append("exit")
+
+
+class VirtualClock:
+    """
+    Stand-in for asyncio.sleep that advances a virtual clock instead of waiting in real time. Sleepers wake up in
+    order of their wake time, so concurrent sleeps of 0.1s advance the clock by 0.1s and sequential ones by 0.2s.
+    """
+
+    # Loop iterations granted to runnable tasks to reach their next sleep before the clock moves on
+    SETTLE_TICKS = 10
+
+    def __init__(self):
+        self.now = 0.0
+        self._real_sleep = asyncio.sleep
+        self._sleepers: list[tuple[float, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._advancer: asyncio.Task | None = None
+
+    async def sleep(self, delay: float, result=None):
+        if delay <= 0:
+            return await self._real_sleep(0, result)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + delay, next(self._order), future))
+        if self._advancer is None or self._advancer.done():
+            self._advancer = asyncio.create_task(self._advance())
+
+        await future
+        return result
+
+    async def _advance(self):
+        while self._sleepers:
+            for _ in range(self.SETTLE_TICKS):
+                await self._real_sleep(0)
+
+            # Cancelled sleepers have a done future already and must not move the clock
+            while self._sleepers and self._sleepers[0][2].done():
+                heapq.heappop(self._sleepers)
+            if not self._sleepers:
+                return
+
+            wake_time = self._sleepers[0][0]
+            self.now = max(self.now, wake_time)
+            while self._sleepers and self._sleepers[0][0] <= wake_time:
+                _, _, future = heapq.heappop(self._sleepers)
+                if not future.done():
+                    future.set_result(None)
@@ -1,3 +1,5 @@
+from collections import deque
+
 import pytest
 from unittest.mock import MagicMock, patch
 
@@ -9,7 +11,7 @@ from big_talk.message import Message, ToolResult
 # Mock the Anthropic stream events
 class MockStream:
     def __init__(self, events):
-        self.events = events
+        self.events = deque(events)
 
     async def __aenter__(self):
         return self
@@ -23,7 +25,7 @@ class MockStream:
     async def __anext__(self):
         if not self.events:
             raise StopAsyncIteration
-        return self.events.pop(0)
+        return self.events.popleft()
 
 
 @pytest.fixture
@@ -1,8 +1,9 @@
+import asyncio
 from unittest.mock import MagicMock
 
 import pytest
 
-from big_talk import BigTalk, AppMessage
+from big_talk import BigTalk, AppMessage, AssistantMessage, Text
 
 
 @pytest.mark.asyncio
@@ -108,6 +109,32 @@ async def test_global_close(bigtalk, create_provider, simple_message):
     assert p2.close_called
 
 
+@pytest.mark.asyncio
+async def test_global_close_aggregates_failures(bigtalk, create_provider, simple_message):
+    """A failing provider must not prevent the others from closing; failures are raised together."""
+    p1 = create_provider()
+    p2 = create_provider()
+
+    async def failing_close():
+        raise RuntimeError("teardown failed")
+
+    p1.close = failing_close
+
+    bigtalk.add_provider("p1", lambda: p1)
+    bigtalk.add_provider("p2", lambda: p2)
+
+    async for _ in bigtalk.stream("p1/m", [simple_message]):
+        pass
+    async for _ in bigtalk.stream("p2/m", [simple_message]):
+        pass
+
+    with pytest.raises(ExceptionGroup) as exc_info:
+        await bigtalk.close()
+
+    assert [str(e) for e in exc_info.value.exceptions] == ["teardown failed"]
+    assert p2.close_called
+
+
 def test_add_provider_duplicate_error():
     """Ensure adding a duplicate provider raises ValueError by default."""
     bt = BigTalk()
@@ -198,3 +225,147 @@ async def test_app_message(bigtalk, create_provider, simple_message):
     # Verify the provider received the stripped model name
     assert len(provider.stream_calls) == 1
     assert provider.stream_calls[0]["model"] == "test-4"
+
+
+@pytest.mark.asyncio
+async def test_reset(bigtalk, create_provider, simple_message):
+    """Verify reset() drops custom providers, cached instances and middleware but keeps the defaults."""
+    bigtalk.add_provider("test", lambda: create_provider())
+
+    @bigtalk.streaming.use
+    async def passthrough(handler, ctx, **kwargs):
+        async for msg in handler(ctx, **kwargs):
+            yield msg
+
+    async for _ in bigtalk.stream("test/m", [simple_message]):
+        pass
+
+    bigtalk.reset()
+
+    assert bigtalk._providers == {}
+    assert set(bigtalk._provider_factories) == {"anthropic", "openai"}
+    assert bigtalk.streaming.build() is bigtalk.streaming._base_handler
+
+    with pytest.raises(NotImplementedError, match="not supported"):
+        async for _ in bigtalk.stream("test/m", [simple_message]):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_stream_buffer_overlaps_provider_and_consumer(create_provider, simple_message, virtual_clock):
+    """The provider keeps producing while the consumer is busy, so the stream takes max(...) instead of sum(...)."""
+
+    async def consume(bt: BigTalk) -> float:
+        bt.add_provider("test", lambda: create_provider(responses=[str(i) for i in range(5)], simulate_latency=0.02))
+        start = virtual_clock.now
+        async for _ in bt.stream("test/m", [simple_message]):
+            await asyncio.sleep(0.02)
+        return virtual_clock.now - start
+
+    buffered = await consume(BigTalk())
+    unbuffered = await consume(BigTalk(stream_buffer_size=None))
+
+    assert unbuffered == pytest.approx(0.2)
+    assert buffered < unbuffered * 0.8
+
+
+@pytest.mark.asyncio
+async def test_stream_buffer_closes_provider_stream_on_early_exit(simple_message):
+    """Abandoning the stream must stop the background producer and close the provider stream."""
+    closed = asyncio.Event()
+
+    class EndlessProvider:
+        async def stream(self, **kwargs):
+            try:
+                while True:
+                    yield AssistantMessage(role="assistant", content=[Text(type="text", text="again")], id="id",
+                                           parent_id="parent", is_aggregate=False)
+                    await asyncio.sleep(0)
+            finally:
+                closed.set()
+
+    bt = BigTalk()
+    bt.add_provider("endless", EndlessProvider)
+
+    stream = bt.stream("endless/m", [simple_message])
+    async for _ in stream:
+        break
+    await stream.aclose()
+
+    await asyncio.wait_for(closed.wait(), timeout=1)
+
+
+class _Abort(BaseException):
+    pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [asyncio.CancelledError, _Abort])
+async def test_stream_buffer_reraises_base_exceptions(simple_message, error):
+    """A source ending with a BaseException must not leave the consumer waiting for the buffer forever."""
+
+    class FailingProvider:
+        async def stream(self, **kwargs):
+            yield AssistantMessage(role="assistant", content=[Text(type="text", text="partial")], id="id",
+                                   parent_id="parent", is_aggregate=False)
+            raise error()
+
+    bt = BigTalk()
+    bt.add_provider("failing", FailingProvider)
+
+    received = []
+
+    async def consume():
+        async for message in bt.stream("failing/m", [simple_message]):
+            received.append(message)
+
+    with pytest.raises(error):
+        await asyncio.wait_for(consume(), timeout=1)
+    assert len(received) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_only_aggregates(bigtalk, simple_message):
+    """Deltas are dropped inside the framework when the caller only wants complete messages."""
+    delta = AssistantMessage(role="assistant", content=[Text(type="text", text="He")], id="a1", parent_id="p",
+                             is_aggregate=False)
+    aggregate = AssistantMessage(role="assistant", content=[Text(type="text", text="Hello")], id="a1",
+                                 parent_id="p", is_aggregate=True)
+
+    class DeltaProvider:
+        async def stream(self, **kwargs):
+            yield delta
+            yield aggregate
+
+    bigtalk.add_provider("test", DeltaProvider)
+
+    seen = []
+
+    @bigtalk.stream_iteration.use
+    async def spy(handler, ctx, **kwargs):
+        async for message in handler(ctx, **kwargs):
+            seen.append(message)
+            yield message
+
+    results = [m async for m in bigtalk.stream("test/m", [simple_message], only_aggregates=True)]
+
+    assert results == [aggregate]
+    # The deltas are already dropped below the stream iteration middleware
+    assert seen == [aggregate]
+
+
+@pytest.mark.asyncio
+async def test_stream_aggregate_flag_is_truthiness(bigtalk, simple_message):
+    """Any truthy is_aggregate marks an aggregate, the same check the iteration handler filters with."""
+    aggregate = AssistantMessage(role="assistant", content=[Text(type="text", text="Hello")], id="a1",
+                                 parent_id="p", is_aggregate=2)
+
+    class LooseProvider:
+        async def stream(self, **kwargs):
+            yield aggregate
+
+    bigtalk.add_provider("test", LooseProvider)
+
+    results = [m async for m in bigtalk.stream("test/m", [simple_message], only_aggregates=True)]
+
+    assert results == [aggregate]
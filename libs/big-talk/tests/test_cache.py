@@ -0,0 +1,134 @@
+import asyncio
+import copy
+
+import pytest
+
+from big_talk import AssistantMessage, Text
+from big_talk.cache import CacheMiddleware, AsyncLRUCache
+
+
+@pytest.mark.asyncio
+async def test_cache_replays_deterministic_calls(bigtalk, create_provider, simple_message):
+    provider = create_provider()
+    bigtalk.add_provider("test", lambda: provider)
+
+    cache = CacheMiddleware()
+    bigtalk.stream_iteration.use(cache)
+
+    first = [m async for m in bigtalk.stream("test/m", [simple_message], temperature=0)]
+    second = [m async for m in bigtalk.stream("test/m", [simple_message], temperature=0)]
+
+    assert second == first
+    assert len(provider.stream_calls) == 1
+    assert cache.stats == {'hits': 1, 'misses': 1, 'skipped': 0}
+
+
+@pytest.mark.asyncio
+async def test_cache_skips_non_deterministic_calls(bigtalk, create_provider, simple_message):
+    provider = create_provider()
+    bigtalk.add_provider("test", lambda: provider)
+
+    cache = CacheMiddleware()
+    bigtalk.stream_iteration.use(cache)
+
+    for _ in range(2):
+        async for _ in bigtalk.stream("test/m", [simple_message]):
+            pass
+        async for _ in bigtalk.stream("test/m", [simple_message], temperature=0.7):
+            pass
+
+    assert len(provider.stream_calls) == 4
+    assert cache.stats['skipped'] == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_key_covers_model_and_kwargs(bigtalk, create_provider, simple_message):
+    provider = create_provider()
+    bigtalk.add_provider("test", lambda: provider)
+    bigtalk.stream_iteration.use(CacheMiddleware())
+
+    async for _ in bigtalk.stream("test/a", [simple_message], temperature=0):
+        pass
+    async for _ in bigtalk.stream("test/b", [simple_message], temperature=0):
+        pass
+    async for _ in bigtalk.stream("test/a", [simple_message], temperature=0, max_tokens=10):
+        pass
+
+    assert len(provider.stream_calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_does_not_store_failed_calls(bigtalk, create_provider, simple_message):
+    provider = create_provider(fail_on_stream=True)
+    bigtalk.add_provider("test", lambda: provider)
+
+    backend = AsyncLRUCache()
+    bigtalk.stream_iteration.use(CacheMiddleware(backend))
+
+    with pytest.raises(RuntimeError):
+        async for _ in bigtalk.stream("test/m", [simple_message], temperature=0):
+            pass
+
+    assert len(backend) == 0
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_eviction_and_ttl():
+    cache = AsyncLRUCache(max_size=2)
+
+    await cache.set("a", [])
+    await cache.set("b", [])
+    await cache.get("a")
+    await cache.set("c", [])
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == ()
+
+    await cache.set("short", [], ttl=0.01)
+    await asyncio.sleep(0.02)
+
+    assert await cache.get("short") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_is_isolated_from_caller_mutations(bigtalk, create_provider, simple_message):
+    # Own responses, the default ones are shared between providers
+    provider = create_provider(responses=["hello", "world"])
+    bigtalk.add_provider("test", lambda: provider)
+    bigtalk.stream_iteration.use(CacheMiddleware())
+
+    first = [m async for m in bigtalk.stream("test/m", [simple_message], temperature=0)]
+    expected = copy.deepcopy(first)
+    first[0]["content"][0]["text"] = "changed by the first caller"
+
+    second = [m async for m in bigtalk.stream("test/m", [simple_message], temperature=0)]
+    second[0]["content"][0]["text"] = "changed by the second caller"
+
+    third = [m async for m in bigtalk.stream("test/m", [simple_message], temperature=0)]
+
+    assert third == expected
+    assert len(provider.stream_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_replays_only_complete_messages(bigtalk, simple_message):
+    delta = AssistantMessage(role="assistant", content=[Text(type="text", text="He")], id="a1", parent_id="p",
+                             is_aggregate=False)
+    aggregate = AssistantMessage(role="assistant", content=[Text(type="text", text="Hello")], id="a1",
+                                 parent_id="p", is_aggregate=True)
+
+    class DeltaProvider:
+        async def stream(self, **kwargs):
+            yield delta
+            yield aggregate
+
+    bigtalk.add_provider("test", DeltaProvider)
+    cache = CacheMiddleware()
+    bigtalk.stream_iteration.use(cache)
+
+    # Filled by a caller that receives deltas, replayed to one that only wants aggregates and vice versa
+    assert [m async for m in bigtalk.stream("test/m", [simple_message], temperature=0)] == [delta, aggregate]
+    assert [m async for m in bigtalk.stream("test/m", [simple_message], temperature=0, only_aggregates=True)] == [
+        aggregate]
+    assert [m async for m in bigtalk.stream("test/m", [simple_message], temperature=0)] == [aggregate]
+    assert cache.stats['hits'] == 2
@@ -1,5 +1,3 @@
-import inspect
-
 import pytest
 from big_talk import AssistantMessage, ToolUse
 from big_talk.tool import tool
@@ -38,6 +36,8 @@ async def test_hidden_dependency_injection(bigtalk, simple_message):
     assert 'query_str' in params
     assert 'db' not in params
     assert 'db' not in query_db.parameters['required']
+    assert list(query_db.hidden_params) == ['db']
+    assert isinstance(query_db.hidden_params['db'], Dependency)
 
     # --- C. Verification 2: Runtime Injection ---
 
@@ -47,11 +47,10 @@ async def test_hidden_dependency_injection(bigtalk, simple_message):
         # Scan for Dependency params and inject the real client
         for tool_use in ctx.tool_uses:
             tool_name = tool_use['name']
-            tool_def = next(t for t in ctx.tools if t.name == tool_name)
+            tool_def = ctx.tools_by_name[tool_name]
 
-            sig = inspect.signature(tool_def.func)
-            for name, param in sig.parameters.items():
-                if isinstance(param.default, Dependency):
+            for name, default in tool_def.hidden_params.items():
+                if isinstance(default, Dependency):
                     # INJECTION HAPPENS HERE
                     tool_use['params'][name] = DatabaseClient()
 
@@ -75,3 +74,22 @@ async def test_hidden_dependency_injection(bigtalk, simple_message):
     # Assert Result
     result = history[0]['content'][0]['result']
     assert result == "SELECT * -> DB_RESULT"
+
+
+def test_hidden_default_values():
+    """Verify hidden default values work for hashable and unhashable defaults alike."""
+
+    sentinel = object()
+
+    @tool(hidden_default_values=[sentinel])
+    def with_sentinel(query: str, ctx: object = sentinel, tags: list = []):
+        pass
+
+    assert 'ctx' not in with_sentinel.parameters['properties']
+    assert 'tags' in with_sentinel.parameters['properties']
+
+    @tool(hidden_default_values=[[]])
+    def with_unhashable(query: str, tags: list = []):
+        pass
+
+    assert 'tags' not in with_unhashable.parameters['properties']
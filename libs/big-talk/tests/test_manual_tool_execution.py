@@ -1,5 +1,3 @@
-import asyncio
-
 import pytest
 
 from big_talk import tool
@@ -56,9 +54,11 @@ async def test_manual_execution_middleware(bigtalk):
         # Run
         tasks = await handler(ctx, **kwargs)
 
-        # Log after (wait for result)
-        results = await asyncio.gather(*tasks)
-        intercepted_log.append(f"Result: {results[0]['result']}")
+        # Log after (each result as soon as it is available)
+        results = [None] * len(ctx.tool_uses)
+        async for index, result in ctx.as_completed(tasks):
+            intercepted_log.append(f"Result: {result['result']}")
+            results[index] = result
 
         # We must re-wrap the result into an awaitable because handler expects it
         async def wrap(r): return r
@@ -97,3 +97,65 @@ async def test_manual_execution_metadata(bigtalk):
 
     assert captured_meta['user_id'] == "123"
     assert captured_meta['source'] == "api"
+
+
+@pytest.mark.asyncio
+async def test_manual_execution_sync_tool(bigtalk):
+    """Verify sync tools are executed without being awaited."""
+
+    @tool
+    def multiplier(a: int, b: int) -> int:
+        return a * b
+
+    @tool
+    def sync_crasher():
+        raise ValueError("Sync Boom!")
+
+    assert not multiplier.is_async
+    assert await bigtalk.execute_tool(multiplier, {"a": 5, "b": 3}) == 15
+
+    with pytest.raises(Exception, match="Sync Boom!"):
+        await bigtalk.execute_tool(sync_crasher, {})
+
+
+@pytest.mark.asyncio
+async def test_manual_execution_metadata_merging(bigtalk):
+    """Verify manual metadata is layered on top of the tool metadata."""
+
+    @tool(metadata={"scope": "read", "source": "tool"})
+    async def scoped_tool(): return "ok"
+
+    captured_meta = []
+
+    @bigtalk.tool_execution.use
+    async def spy(handler, ctx, **kwargs):
+        captured_meta.append(ctx.tool_uses[0]['metadata'])
+        return await handler(ctx, **kwargs)
+
+    await bigtalk.execute_tool(scoped_tool, {})
+    await bigtalk.execute_tool(scoped_tool, {}, metadata={"source": "api"})
+
+    assert captured_meta[0] == {"scope": "read", "source": "tool"}
+    # Without per-call metadata the read-only tool metadata is shared instead of copied
+    assert captured_meta[0] is scoped_tool.metadata
+    assert captured_meta[1] == {"scope": "read", "source": "api"}
+    assert scoped_tool.metadata["source"] == "tool"
+
+
+@pytest.mark.asyncio
+async def test_manual_execution_safe_tool(bigtalk):
+    """Verify safe tools skip error handling, so unexpected exceptions propagate unchanged."""
+
+    @tool(safe=True)
+    def safe_adder(a: int, b: int) -> int:
+        return a + b
+
+    @tool(safe=True)
+    async def unexpectedly_unsafe():
+        raise KeyError("missing")
+
+    assert safe_adder.safe
+    assert await bigtalk.execute_tool(safe_adder, {"a": 1, "b": 2}) == 3
+
+    with pytest.raises(KeyError):
+        await bigtalk.execute_tool(unexpectedly_unsafe, {})
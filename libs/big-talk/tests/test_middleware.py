@@ -1,6 +1,10 @@
+import asyncio
+from unittest.mock import MagicMock
+
 import pytest
 
-from big_talk import AssistantMessage, Text, AppMessage, ToolUse
+from big_talk import AssistantMessage, Text, AppMessage, ToolUse, StreamIterationContext
+from big_talk.middleware import MiddlewareStack
 
 
 @pytest.mark.asyncio
@@ -159,7 +163,7 @@ async def test_middleware_history_loading_deduplication(bigtalk, create_provider
 
         history_loaded_count += 1
         # Prepend DB history to the current input
-        ctx.messages = db_history + ctx.messages
+        ctx.prepend_messages(db_history)
 
         start_msg = AppMessage(role="app", content=None, id="start_msg", type="start")
         yield start_msg
@@ -246,3 +250,146 @@ async def test_middleware_history_loading_deduplication(bigtalk, create_provider
     ids = [m['id'] for m in captured_message_lists[1]]
     assert ids == ["old_1", "old_2", simple_message['id'], "start_msg", "msg_tool",
                    ids[5]]  # ids[4] is generated tool result ID
+
+
+@pytest.mark.asyncio
+async def test_stream_iteration_prepend_does_not_change_history(bigtalk, create_provider, simple_message):
+    """Messages prepended for one iteration must not pile up in the history of the following iterations."""
+    system_msg = AssistantMessage(role="assistant", content=[Text(type="text", text="Context")], id="context",
+                                  is_aggregate=True)
+
+    @bigtalk.stream_iteration.use
+    async def context_middleware(handler, ctx, **kwargs):
+        ctx.prepend_messages([system_msg])
+        async for msg in handler(ctx, **kwargs):
+            yield msg
+
+    responses = [
+        AssistantMessage(role="assistant", content=[ToolUse(type="tool_use", id=f"call_{i}", name="test_tool",
+                                                            params={})], id=f"msg_tool_{i}", is_aggregate=True)
+        for i in range(2)
+    ] + [AssistantMessage(role="assistant", content=[Text(type="text", text="Done")], id="msg_final",
+                          is_aggregate=True)]
+
+    mock_provider = create_provider()
+    captured_ids = []
+
+    async def mock_stream_gen(model, messages, **kwargs):
+        captured_ids.append([m['id'] for m in messages])
+        yield responses[len(captured_ids) - 1]
+
+    mock_provider.stream = mock_stream_gen
+    bigtalk.add_provider("test", lambda: mock_provider)
+
+    async def test_tool():
+        return "Tool Result Data"
+
+    results = [m async for m in bigtalk.stream("test/model", [simple_message], tools=[test_tool])]
+
+    assert results[-1]['id'] == "msg_final"
+    assert len(captured_ids) == 3
+    # Every iteration sees the injected message exactly once, in front of the history
+    assert all(ids.count("context") == 1 and ids[0] == "context" for ids in captured_ids)
+    assert [len(ids) for ids in captured_ids] == [2, 4, 6]
+
+
+def test_middleware_chain_is_built_once():
+    """The composed chain is reused until the registered middleware changes."""
+    stack = MiddlewareStack(MagicMock())
+
+    assert stack.build() is stack.build()
+
+    async def mw(handler, ctx, **kwargs):
+        return await handler(ctx, **kwargs)
+
+    without_mw = stack.build()
+    stack.use(mw)
+    with_mw = stack.build()
+
+    assert with_mw is not without_mw
+    assert stack.build() is with_mw
+
+    stack.clear()
+
+    assert stack.build() is not with_mw
+
+
+@pytest.mark.asyncio
+async def test_middleware_speculative_branches(bigtalk, create_provider, simple_message, virtual_clock):
+    """Middleware can race the same request against several models and keep the fastest response."""
+    slow = create_provider(name="slow", responses=["slow"], simulate_latency=1)
+    fast = create_provider(name="fast", responses=["fast"])
+    bigtalk.add_provider("slow", lambda: slow)
+    bigtalk.add_provider("fast", lambda: fast)
+
+    async def race(handler, ctx, **kwargs):
+        async def collect(branch_ctx):
+            return [m async for m in handler(branch_ctx, **kwargs)]
+
+        async with ctx.branches() as tg:
+            branches = [tg.create_task(collect(ctx.copy(model=model))) for model in ("slow/m", "fast/m")]
+            winner = await ctx.select_first(branches)
+
+        for message in winner:
+            yield message
+
+    bigtalk.stream_iteration.use(race)
+
+    results = [m async for m in bigtalk.stream("slow/m", [simple_message])]
+
+    assert [m['content'][0]['text'] for m in results] == ["fast"]
+    assert len(slow.stream_calls) == 1
+    # The slow branch is cancelled instead of awaited
+    assert virtual_clock.now == 0
+
+
+class _Abort(BaseException):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_select_first_reraises_cancellation_when_all_branches_are_cancelled():
+    async def branch():
+        await asyncio.sleep(3600)
+
+    tasks = [asyncio.create_task(branch()) for _ in range(2)]
+    for task in tasks:
+        task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await StreamIterationContext.select_first(tasks)
+
+
+@pytest.mark.asyncio
+async def test_select_first_groups_base_exceptions():
+    async def fail():
+        raise ValueError("failed")
+
+    async def abort():
+        raise _Abort()
+
+    tasks = [asyncio.create_task(fail()), asyncio.create_task(abort())]
+
+    with pytest.raises(BaseExceptionGroup) as exc_info:
+        await StreamIterationContext.select_first(tasks)
+
+    assert sorted(type(e).__name__ for e in exc_info.value.exceptions) == ["ValueError", "_Abort"]
+
+    tasks = [asyncio.create_task(fail()), asyncio.create_task(fail())]
+
+    # Plain exceptions are still raised as an ExceptionGroup
+    with pytest.raises(ExceptionGroup):
+        await StreamIterationContext.select_first(tasks)
+
+
+def test_stream_context_copy_is_independent(simple_message):
+    ctx = StreamIterationContext(model="a/m", tools=[], messages=[simple_message], _provider_resolver=MagicMock(),
+                                 iteration=0)
+
+    branch = ctx.copy(model="b/m")
+    branch.messages.append(simple_message)
+
+    assert branch.model == "b/m"
+    assert branch.iteration == 0
+    assert ctx.model == "a/m"
+    assert len(ctx.messages) == 1
@@ -1,41 +1,70 @@
+import copy
+import json
+import pickle
+from dataclasses import dataclass, field
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from big_talk import UserMessage
+from big_talk import UserMessage, AssistantMessage, ToolUse
 from big_talk.llm.openai import OpenAIProvider
 from big_talk.message import Message
-from big_talk.tool import Tool
+from big_talk.tool import Tool, tool
+
+
+# Plain slotted stand-ins for the OpenAI chunk types, attribute access on MagicMock trees is much slower
+@dataclass(slots=True, frozen=True)
+class _Function:
+    name: str | None = None
+    arguments: str | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class _ToolCall:
+    index: int
+    id: str | None = None
+    function: _Function = field(default_factory=_Function)
+
+
+@dataclass(slots=True, frozen=True)
+class _Delta:
+    content: str | None = None
+    tool_calls: list[_ToolCall] | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class _Choice:
+    delta: _Delta
+
+
+@dataclass(slots=True, frozen=True)
+class _Chunk:
+    choices: list[_Choice]
 
 
 # Helper to create OpenAI-style chunks
 def create_chunk(text=None, tool_calls=None):
-    delta = MagicMock()
-    delta.content = text
-    delta.tool_calls = tool_calls
-    choice = MagicMock()
-    choice.delta = delta
-    chunk = MagicMock()
-    chunk.choices = [choice]
-    return chunk
+    return _Chunk(choices=[_Choice(delta=_Delta(content=text, tool_calls=tool_calls))])
 
 
 # Helper to create tool call chunks
 def create_tool_chunk(index, id=None, name=None, args=None):
-    tc = MagicMock()
-    tc.index = index
-    tc.id = id
-    tc.function.name = name
-    tc.function.arguments = args
-    return [tc]
+    return [_ToolCall(index=index, id=id, function=_Function(name=name, arguments=args))]
+
+
+@pytest.fixture(scope="session")
+def session_openai_provider():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("OPENAI_API_KEY", "dummy-key-for-tests")
+        yield OpenAIProvider()
 
 
 @pytest.fixture
-def openai_provider(monkeypatch):
-    monkeypatch.setenv("OPENAI_API_KEY", "dummy-key-for-tests")
-    provider = OpenAIProvider()
-    provider._client = MagicMock()
-    provider._client.chat.completions.create = AsyncMock()
-    return provider
+def openai_provider(session_openai_provider):
+    """Reuses one provider for the whole session and only swaps in a fresh client mock per test."""
+    session_openai_provider._client = MagicMock()
+    session_openai_provider._client.chat.completions.create = AsyncMock()
+    return session_openai_provider
 
 
 @pytest.mark.asyncio
@@ -54,6 +83,9 @@ async def test_openai_reactive_streaming(openai_provider):
 
         # 3. Start Tool 1 (Should trigger Tool 0 yield)
         create_chunk(tool_calls=create_tool_chunk(1, id="call_2", name="get_time", args='{}')),
+
+        # 4. Usage-only chunk without choices (stream_options={"include_usage": True})
+        _Chunk(choices=[]),
     ]
 
     openai_provider._client.chat.completions.create.return_value = mock_stream
@@ -81,20 +113,48 @@ async def test_openai_reactive_streaming(openai_provider):
     assert results[2]["content"][0]["name"] == "get_time"
 
 
-def test_openai_token_counting_with_tools(openai_provider):
+@pytest.mark.asyncio
+async def test_openai_streamed_tool_uses_are_serializable(openai_provider):
+    """Tool uses share the read-only tool metadata, which serializes like a dict, so the history can be persisted."""
+
+    @tool(metadata={"scope": "read"})
+    def get_weather(loc: str): pass
+
+    mock_stream = AsyncMock()
+    mock_stream.__aiter__.return_value = [
+        create_chunk(tool_calls=create_tool_chunk(0, id="call_1", name="get_weather", args='{"loc":"NYC"}')),
+    ]
+    openai_provider._client.chat.completions.create.return_value = mock_stream
+
+    stream = openai_provider.stream("gpt-4", [UserMessage(role="user", content="Hi", id="u1")], tools=[get_weather])
+    aggregate = [msg async for msg in stream][-1]
+
+    assert json.loads(json.dumps(aggregate)) == aggregate
+    assert copy.deepcopy(aggregate) == aggregate
+    assert pickle.loads(pickle.dumps(aggregate)) == aggregate
+
+    # The metadata is shared with the tool and cannot be changed through a tool use
+    assert aggregate["content"][0]["metadata"] is get_weather.metadata
+    with pytest.raises(TypeError):
+        aggregate["content"][0]["metadata"]["scope"] = "write"
+    assert get_weather.metadata == {"scope": "read"}
+
+
+def test_openai_token_counting_with_tools(openai_provider, monkeypatch):
     """Test the complex logic for counting tool definition tokens."""
 
     # Mock tiktoken
     mock_encoding = MagicMock()
     mock_encoding.encode = lambda s: [1] * len(s)  # Mock: 1 char = 1 token
-    openai_provider._tiktoken = MagicMock()
-    openai_provider._tiktoken.encoding_for_model.return_value = mock_encoding
+    monkeypatch.setattr(openai_provider, "_encoding_for_model", lambda model: mock_encoding)
 
     def my_tool(x: int):
         """Desc."""
         pass
 
     tools = [Tool.from_func(my_tool)]
+    # Converting the same function again reuses the tool instead of inspecting it again
+    assert Tool.from_func(my_tool) is tools[0]
     messages = [UserMessage(role="user", content="hi", id="u1")]
 
     # We just want to ensure it runs without error and returns a number > 0
@@ -104,6 +164,8 @@ def test_openai_token_counting_with_tools(openai_provider):
     count = asyncio.run(openai_provider.count_tokens("gpt-4", messages, tools=tools))
 
     assert count > 0
+    # Tool definitions are part of the prompt and must be counted as well
+    assert count > asyncio.run(openai_provider.count_tokens("gpt-4", messages, tools=[]))
 
 
 def test_openai_init_kwargs():
@@ -125,3 +187,19 @@ def test_openai_init_kwargs():
         )
 
         assert provider._client == MockClient.return_value
+
+
+def test_openai_tool_call_arguments_round_trip():
+    """Tool use params are encoded as JSON arguments when replaying assistant messages."""
+    params = {"loc": "Zürich", "days": [1, 2]}
+    messages = [
+        UserMessage(role="user", content="Weather?", id="u1"),
+        AssistantMessage(role="assistant", content=[ToolUse(type="tool_use", id="call_1", name="get_weather",
+                                                            params=params)], id="a1", is_aggregate=True),
+    ]
+
+    converted, _ = OpenAIProvider._convert_messages(messages)
+
+    tool_call = converted[1]["tool_calls"][0]
+    assert tool_call["function"]["name"] == "get_weather"
+    assert json.loads(tool_call["function"]["arguments"]) == params
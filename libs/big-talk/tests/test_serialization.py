@@ -0,0 +1,90 @@
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import IntEnum
+
+import pytest
+
+from big_talk import serialization
+from big_talk.serialization import serialize_tool_result, loads_json, dumps_json
+
+
+def test_serialize_scalars():
+    assert serialize_tool_result("plain text") == "plain text"
+    assert serialize_tool_result(None) == "null"
+    assert serialize_tool_result(True) == "true"
+    assert serialize_tool_result(False) == "false"
+    assert serialize_tool_result(42) == "42"
+    assert serialize_tool_result(1.5) == "1.5"
+
+
+def test_serialize_containers():
+    result = {"city": "Zürich", "temps": [1, 2.5], 1: "int key"}
+
+    serialized = serialize_tool_result(result)
+
+    assert "Zürich" in serialized
+    assert json.loads(serialized) == {"city": "Zürich", "temps": [1, 2.5], "1": "int key"}
+
+
+def test_dumps_json_is_compact():
+    # Same output with and without orjson installed
+    assert dumps_json({"city": "Zürich", "temps": [1, 2.5]}) == '{"city":"Zürich","temps":[1,2.5]}'
+
+
+def test_serialize_big_integers():
+    result = {"big": 2 ** 64, "list": [-(2 ** 70)]}
+
+    assert json.loads(serialize_tool_result(result)) == result
+    assert serialize_tool_result(2 ** 64) == str(2 ** 64)
+
+
+@dataclass
+class _Booking:
+    on: date
+    nights: int
+
+
+@pytest.mark.parametrize("result", [
+    {"city": "Zürich", "temps": [1, 2.5, None, True], 1: "int key"},
+    [2 ** 64, -(2 ** 70)],
+    {"on": date(2024, 1, 31), "at": datetime(2024, 1, 31, 12, 30)},
+    _Booking(on=date(2024, 1, 31), nights=2),
+    {"booking": _Booking(on=date(2024, 1, 31), nights=2)},
+    date(2024, 1, 31),
+])
+def test_serialization_does_not_depend_on_orjson(result, monkeypatch):
+    with_orjson = serialize_tool_result(result)
+
+    monkeypatch.setattr(serialization, "_dumps", serialization._json_dumps)
+
+    assert serialize_tool_result(result) == with_orjson
+
+
+def test_serialize_unsupported_falls_back_to_str():
+    class Opaque:
+        def __str__(self):
+            return "opaque"
+
+    opaque = Opaque()
+
+    assert serialize_tool_result(opaque) == "opaque"
+    assert serialize_tool_result({"value": opaque}) == str({"value": opaque})
+
+
+def test_serialize_scalar_subclasses():
+    class Priority(IntEnum):
+        HIGH = 1
+
+    class Label(str):
+        pass
+
+    assert serialize_tool_result(Priority.HIGH) == "1"
+    assert serialize_tool_result(Label("urgent")) == "urgent"
+
+
+def test_loads_json():
+    assert loads_json('{"loc": "Zürich", "days": [1, 2]}') == {"loc": "Zürich", "days": [1, 2]}
+
+    with pytest.raises(json.JSONDecodeError):
+        loads_json('{"loc":')
@@ -1,9 +1,12 @@
 import asyncio
+import threading
 import time
 
 import pytest
 
-from big_talk import AssistantMessage, ToolUse, Text
+from big_talk import AssistantMessage, ToolUse, Text, BigTalk, ToolResult, ToolExecutionContext, Tool, tool
+from big_talk.loop import use_tools_as_completed
+from big_talk.tool_execution import BaseToolExecutionHandler
 from tests.helpers import MockToolProvider
 
 
@@ -39,11 +42,9 @@ async def test_tool_execution_persistence(bigtalk, simple_message):
     history = [simple_message]  # Start with User message
 
     # We simulate a real app loop here
-    async for msg in bigtalk.stream("test/model", history, tools=[my_tool]):
-        # We only append AGGREGATE messages to our history
-        # (BigTalk yields deltas too, but our mock yields full messages)
-        if msg.get('is_aggregate') or msg['role'] == 'tool':
-            history.append(msg)
+    # We only append complete messages to our history, BigTalk drops the deltas for us
+    async for msg in bigtalk.stream("test/model", history, tools=[my_tool], only_aggregates=True):
+        history.append(msg)
 
     # 4. Assertions on the UPDATED history
     assert len(history) == 4
@@ -65,7 +66,7 @@ async def test_tool_execution_persistence(bigtalk, simple_message):
 
 
 @pytest.mark.asyncio
-async def test_parallel_execution_speed(bigtalk, simple_message):
+async def test_parallel_execution_speed(bigtalk, simple_message, virtual_clock):
     """Verify tools run in parallel."""
 
     async def slow_1():
@@ -91,12 +92,10 @@ async def test_parallel_execution_speed(bigtalk, simple_message):
 
     history = [simple_message]
 
-    start = time.time()
     async for msg in bigtalk.stream("test/model", history, tools=[slow_1, slow_2]):
         pass
-    duration = time.time() - start
 
-    assert duration < 0.18  # Parallel (0.1s) vs Serial (0.2s)
+    assert virtual_clock.now == pytest.approx(0.1)  # Parallel (0.1s) vs Serial (0.2s)
 
 
 @pytest.mark.asyncio
@@ -196,6 +195,41 @@ async def test_tool_middleware_interception(bigtalk, simple_message):
     assert result_str == "Intercepted: Hello"
 
 
+@pytest.mark.asyncio
+async def test_tool_result_post_processing(bigtalk, simple_message):
+    """Verify post processors transform every result without wrapping the executions."""
+
+    async def echo_tool(val: str):
+        return val
+
+    def sync_echo_tool(val: str):
+        return val
+
+    @bigtalk.tool_execution.post_process
+    def intercept(result):
+        result['result'] = f"Intercepted: {result['result']}"
+        return result
+
+    tool_msg = AssistantMessage(
+        role="assistant",
+        content=[ToolUse(type="tool_use", id="1", name="echo_tool", params={"val": "Hello"}),
+                 ToolUse(type="tool_use", id="2", name="sync_echo_tool", params={"val": "World"}),
+                 ToolUse(type="tool_use", id="3", name="ghost_tool", params={})],
+        id="resp_1", parent_id="p_1", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([tool_msg]))
+
+    tool_messages = [msg async for msg in bigtalk.stream("test/model", [simple_message],
+                                                         tools=[echo_tool, sync_echo_tool]) if msg['role'] == 'tool']
+
+    assert [r['result'] for r in tool_messages[0]['content']] == [
+        "Intercepted: Hello", "Intercepted: World", "Intercepted: Tool ghost_tool not found"]
+
+    bigtalk.tool_execution.clear()
+
+    assert await bigtalk.execute_tool(echo_tool, {"val": "Hello"}) == "Hello"
+
+
 @pytest.mark.asyncio
 async def test_tool_not_found(bigtalk, simple_message):
     """Verify behavior when LLM calls a non-existent tool."""
@@ -312,3 +346,585 @@ async def test_batch_tool_execution_grouping(bigtalk, simple_message):
     assert res_A['content'][0]['result'] == "1"
     assert res_B['content'][0]['result'] == "2"
 
+
+@pytest.mark.asyncio
+async def test_results_are_matched_by_tool_use_id(bigtalk, simple_message):
+    """Verify results end up with their parent in call order even if middleware reorders the executions."""
+
+    async def echo(value: str):
+        return value
+
+    msg_1 = AssistantMessage(
+        role="assistant",
+        content=[ToolUse(type="tool_use", id=f"a{i}", name="echo", params={"value": f"a{i}"}) for i in range(2)],
+        id="parent_A", parent_id="p", is_aggregate=True
+    )
+    msg_2 = AssistantMessage(
+        role="assistant",
+        content=[ToolUse(type="tool_use", id="b0", name="echo", params={"value": "b0"})],
+        id="parent_B", parent_id="p", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([msg_1, msg_2]))
+
+    @bigtalk.tool_execution.use
+    async def reverse_middleware(handler, ctx, **kwargs):
+        return list(reversed(list(await handler(ctx, **kwargs))))
+
+    tool_messages = [msg async for msg in bigtalk.stream("test/model", [simple_message], tools=[echo])
+                     if msg['role'] == 'tool']
+
+    assert {m['parent_id']: [r['result'] for r in m['content']] for m in tool_messages} == {
+        "parent_A": ["a0", "a1"],
+        "parent_B": ["b0"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_escaped_errors_are_attributed_to_their_tool_use(bigtalk, simple_message):
+    """Verify errors escaping reordered executions are reported for the tool use that raised them."""
+
+    @tool(safe=True)
+    async def broken():
+        raise ValueError("broken on purpose")
+
+    async def echo(value: str):
+        return value
+
+    tool_msg = AssistantMessage(
+        role="assistant",
+        content=[ToolUse(type="tool_use", id="1", name="broken", params={}),
+                 ToolUse(type="tool_use", id="2", name="echo", params={"value": "ok"}),
+                 ToolUse(type="tool_use", id="3", name="echo", params={"value": "also ok"})],
+        id="m1", parent_id="p", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([tool_msg]))
+
+    @bigtalk.tool_execution.use
+    async def reverse_middleware(handler, ctx, **kwargs):
+        return list(reversed(list(await handler(ctx, **kwargs))))
+
+    tool_messages = [msg async for msg in bigtalk.stream("test/model", [simple_message], tools=[broken, echo])
+                     if msg['role'] == 'tool']
+
+    assert [(r['tool_use_id'], r['result'], r['is_error']) for r in tool_messages[0]['content']] == [
+        ("1", "broken on purpose", True),
+        ("2", "ok", False),
+        ("3", "also ok", False),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tool_ids", [["1"], ["1", "2"]])
+async def test_rewritten_result_ids_still_answer_their_tool_use(tool_ids):
+    """Verify results whose id was rewritten by middleware answer the tool use they were executed for."""
+
+    async def echo(value: str):
+        return value
+
+    async def rewrite(result_task):
+        result = await result_task
+        return {**result, "tool_use_id": f"rewritten_{result['tool_use_id']}"}
+
+    async def rewrite_ids_middleware(handler, ctx, **kwargs):
+        # Wrappers are bound to the tool use of the awaitable they wrap
+        return [ctx.bind(ctx.tool_use_id_of(task), rewrite(task)) for task in await handler(ctx, **kwargs)]
+
+    tool_uses = [ToolUse(type="tool_use", id=tool_id, name="echo", params={"value": tool_id}) for tool_id in tool_ids]
+    handler = BaseToolExecutionHandler()
+
+    groups = [group async for group in use_tools_as_completed(
+        [("parent", tool_use) for tool_use in tool_uses], [], [Tool.from_func(echo)], 0,
+        lambda ctx: rewrite_ids_middleware(handler, ctx))]
+
+    assert [(r["tool_use_id"], r["result"]) for _, results in groups for r in results] == \
+        [(tool_id, tool_id) for tool_id in tool_ids]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tool_ids", [["1"], ["1", "2"]])
+async def test_missing_results_are_reported_as_errors(tool_ids):
+    """Verify executions that produce no result are answered with an error, with one tool use as with several."""
+
+    async def echo(value: str):
+        return value
+
+    async def discard(result_task):
+        await result_task
+
+    async def discard_results_middleware(handler, ctx, **kwargs):
+        return [ctx.bind(ctx.tool_use_id_of(task), discard(task)) for task in await handler(ctx, **kwargs)]
+
+    tool_uses = [ToolUse(type="tool_use", id=tool_id, name="echo", params={"value": tool_id}) for tool_id in tool_ids]
+    handler = BaseToolExecutionHandler()
+
+    groups = [group async for group in use_tools_as_completed(
+        [("parent", tool_use) for tool_use in tool_uses], [], [Tool.from_func(echo)], 0,
+        lambda ctx: discard_results_middleware(handler, ctx))]
+
+    assert [(r["tool_use_id"], r["is_error"], r["result"]) for _, results in groups for r in results] == \
+        [(tool_id, True, "Tool echo produced no result") for tool_id in tool_ids]
+
+
+@pytest.mark.asyncio
+async def test_unattributable_results_still_answer_every_tool_use(bigtalk, simple_message):
+    """Verify tool uses whose result cannot be attributed get an error result instead of no result at all."""
+
+    @tool(safe=True)
+    async def broken():
+        raise ValueError("broken on purpose")
+
+    async def echo(value: str):
+        return value
+
+    tool_msg = AssistantMessage(
+        role="assistant",
+        content=[ToolUse(type="tool_use", id="1", name="broken", params={}),
+                 ToolUse(type="tool_use", id="2", name="echo", params={"value": "ok"}),
+                 ToolUse(type="tool_use", id="3", name="echo", params={"value": "dropped"})],
+        id="m1", parent_id="p", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([tool_msg]))
+
+    async def passthrough(task):
+        return await task
+
+    @bigtalk.tool_execution.use
+    async def unbound_middleware(handler, ctx, **kwargs):
+        # Wraps without binding, reverses and drops the last execution
+        tasks = list(await handler(ctx, **kwargs))[:-1]
+        return [passthrough(task) for task in reversed(tasks)]
+
+    tool_messages = [msg async for msg in bigtalk.stream("test/model", [simple_message], tools=[broken, echo])
+                     if msg['role'] == 'tool']
+
+    assert len(tool_messages) == 1
+    assert [(r['tool_use_id'], r['is_error']) for r in tool_messages[0]['content']] == [
+        ("1", True),
+        ("2", False),
+        ("3", True),
+    ]
+    assert tool_messages[0]['content'][1]['result'] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_tool_groups_are_yielded_as_they_complete(virtual_clock):
+    """Verify a parent's results do not wait for the slower tools of another parent."""
+
+    async def wait(seconds: float):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    tool_uses_by_parent = [
+        ("parent_slow", ToolUse(type="tool_use", id="slow", name="wait", params={"seconds": 0.3})),
+        ("parent_fast", ToolUse(type="tool_use", id="fast_1", name="wait", params={"seconds": 0.2})),
+        ("parent_fast", ToolUse(type="tool_use", id="fast_2", name="wait", params={"seconds": 0.1})),
+    ]
+
+    received = [(parent_id, virtual_clock.now, [r['result'] for r in results])
+                async for parent_id, results in use_tools_as_completed(tool_uses_by_parent, [], [Tool.from_func(wait)],
+                                                                       0, BaseToolExecutionHandler(), ordered=False)]
+
+    assert received == [
+        ("parent_fast", pytest.approx(0.2), [0.2, 0.1]),
+        ("parent_slow", pytest.approx(0.3), [0.3]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_tool_messages_in_request_order(bigtalk, simple_message, virtual_clock):
+    """Verify tool messages follow the order of their parents regardless of which tools finish first."""
+
+    async def wait(seconds: float):
+        await asyncio.sleep(seconds)
+        return seconds
+
+    def parent(parent_id: str, *durations: float) -> AssistantMessage:
+        return AssistantMessage(
+            role="assistant",
+            content=[ToolUse(type="tool_use", id=f"{parent_id}_{i}", name="wait", params={"seconds": d})
+                     for i, d in enumerate(durations)],
+            id=parent_id, parent_id="p", is_aggregate=True
+        )
+
+    class BatchProvider:
+        def __init__(self):
+            self.batches = [[parent("a1", 0.3), parent("a2", 0.1), parent("a3", 0.4)]]
+
+        async def stream(self, **kwargs):
+            for message in (self.batches.pop(0) if self.batches else []):
+                yield message
+
+    bigtalk.add_provider("test", BatchProvider)
+
+    received = [(msg['role'], msg['parent_id'] if msg['role'] == 'tool' else msg['id'], virtual_clock.now)
+                async for msg in bigtalk.stream("test/model", [simple_message], tools=[wait])]
+
+    assert received == [
+        ("assistant", "a1", 0),
+        ("assistant", "a2", 0),
+        ("assistant", "a3", 0),
+        # a1 is released as soon as it is done, a2 finished earlier but waits for a1
+        ("tool", "a1", pytest.approx(0.3)),
+        ("tool", "a2", pytest.approx(0.3)),
+        ("tool", "a3", pytest.approx(0.4)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_single_tool_runs_in_the_calling_task():
+    """Verify a lone tool call is awaited directly instead of being wrapped in tasks."""
+
+    async def current_task():
+        return asyncio.current_task()
+
+    tool_uses_by_parent = [("parent", ToolUse(type="tool_use", id="call_1", name="current_task", params={}))]
+
+    received = [(parent_id, results) async for parent_id, results in
+                use_tools_as_completed(tool_uses_by_parent, [], [Tool.from_func(current_task)], 0,
+                                       BaseToolExecutionHandler())]
+
+    assert received == [("parent", [ToolResult(type="tool_result", tool_use_id="call_1",
+                                               result=asyncio.current_task(), is_error=False)])]
+
+
+@pytest.mark.asyncio
+async def test_tools_start_before_being_awaited(bigtalk, simple_message):
+    """Verify the handler schedules tool executions eagerly instead of returning idle coroutines."""
+
+    started = []
+
+    async def tracked_tool(name: str):
+        started.append(name)
+        return "done"
+
+    @bigtalk.tool_execution.use
+    async def delayed_await_middleware(handler, ctx, **kwargs):
+        tasks = await handler(ctx, **kwargs)
+
+        # Give the event loop a chance to run scheduled tasks
+        await asyncio.sleep(0)
+        assert started == ["a", "b"]
+
+        return tasks
+
+    tool_msg = AssistantMessage(
+        role="assistant",
+        content=[
+            ToolUse(type="tool_use", id="1", name="tracked_tool", params={"name": "a"}),
+            ToolUse(type="tool_use", id="2", name="tracked_tool", params={"name": "b"})
+        ],
+        id="resp_1", parent_id="p_1", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([tool_msg]))
+
+    tool_messages = [msg async for msg in bigtalk.stream("test/model", [simple_message], tools=[tracked_tool])
+                     if msg['role'] == 'tool']
+
+    assert [r['result'] for r in tool_messages[0]['content']] == ["done", "done"]
+
+
+@pytest.mark.asyncio
+async def test_max_tool_concurrency(simple_message):
+    """Verify the number of concurrently running tools can be bounded."""
+
+    bigtalk = BigTalk(max_tool_concurrency=1)
+
+    running = 0
+    max_running = 0
+
+    async def tracked():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "ok"
+
+    tool_msg = AssistantMessage(
+        role="assistant",
+        content=[ToolUse(type="tool_use", id=str(i), name="tracked", params={}) for i in range(3)],
+        id="m1", parent_id="p", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([tool_msg]))
+
+    tool_messages = [msg async for msg in bigtalk.stream("test/model", [simple_message], tools=[tracked])
+                     if msg['role'] == 'tool']
+
+    assert [r['result'] for r in tool_messages[0]['content']] == ["ok", "ok", "ok"]
+    assert max_running == 1
+
+
+@pytest.mark.asyncio
+async def test_as_completed_yields_in_completion_order():
+    """Verify results are yielded as they finish, tagged with their original index."""
+
+    async def result_after(delay: float, result: str):
+        await asyncio.sleep(delay)
+        return ToolResult(type="tool_result", tool_use_id=result, result=result, is_error=False)
+
+    tasks = [result_after(0.03, "slow"), result_after(0.01, "fast"), result_after(0.02, "medium")]
+
+    completed = [(index, result['result']) async for index, result in ToolExecutionContext.as_completed(tasks)]
+
+    assert completed == [(1, "fast"), (2, "medium"), (0, "slow")]
+
+
+@pytest.mark.asyncio
+async def test_as_completed_buffer_size():
+    """Verify buffer_size bounds how many awaitables run at the same time."""
+
+    running = 0
+    max_running = 0
+
+    async def tracked(index: int):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return ToolResult(type="tool_result", tool_use_id=str(index), result=index, is_error=False)
+
+    tasks = [tracked(i) for i in range(5)]
+
+    completed = [index async for index, _ in ToolExecutionContext.as_completed(tasks, buffer_size=2)]
+
+    assert sorted(completed) == [0, 1, 2, 3, 4]
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_no_tool_uses_returns_no_tasks():
+    """Verify the handler short-circuits when the assistant did not request any tools."""
+    handler = BaseToolExecutionHandler()
+
+    def unused_tool(): pass
+
+    unused = Tool.from_func(unused_tool)
+    ctx = ToolExecutionContext(iteration=1, tool_uses=[], tools=[unused], messages=[])
+
+    assert await handler(ctx) == []
+    assert ctx.tools_by_name == {"unused_tool": unused}
+
+
+@pytest.mark.asyncio
+async def test_non_suspending_tools_finish_eagerly():
+    """Verify tools that never suspend are already done when the handler hands out their tasks."""
+    handler = BaseToolExecutionHandler()
+
+    async def instant(value: int):
+        return value
+
+    ctx = ToolExecutionContext(
+        iteration=1,
+        tool_uses=[ToolUse(type="tool_use", id=f"call_{i}", name="instant", params={"value": i}) for i in range(3)],
+        tools=[Tool.from_func(instant)],
+        messages=[]
+    )
+
+    tasks = await handler(ctx)
+
+    assert all(task.done() for task in tasks)
+    assert [task.result()['result'] for task in tasks] == [0, 1, 2]
+
+
+def test_tools_by_name():
+    """Verify the name lookup is built once per context and follows replaced tools."""
+
+    def first(): pass
+
+    def second(): pass
+
+    first_tool, second_tool = Tool.from_func(first), Tool.from_func(second)
+    ctx = ToolExecutionContext(iteration=1, tool_uses=[], tools=[first_tool], messages=[])
+
+    assert ctx.tools_by_name == {"first": first_tool}
+    assert ctx.tools_by_name is ctx.tools_by_name
+
+    ctx.tools = [second_tool]
+
+    assert ctx.tools_by_name == {"second": second_tool}
+
+    ctx.tools = [*ctx.tools, first_tool]
+
+    assert ctx.tools_by_name == {"first": first_tool, "second": second_tool}
+
+
+@pytest.mark.slow
+@pytest.mark.timing
+@pytest.mark.asyncio
+async def test_sync_and_async_tools_mix(bigtalk, simple_message):
+    """Verify blocking sync tools run in worker threads and overlap with each other and with async tools."""
+
+    def blocking_1():
+        time.sleep(0.1)
+        return "1"
+
+    def blocking_2():
+        time.sleep(0.1)
+        return "2"
+
+    async def slow_3():
+        await asyncio.sleep(0.1)
+        return "3"
+
+    tool_msg = AssistantMessage(
+        role="assistant",
+        content=[
+            ToolUse(type="tool_use", id="a", name="blocking_1", params={}),
+            ToolUse(type="tool_use", id="b", name="blocking_2", params={}),
+            ToolUse(type="tool_use", id="c", name="slow_3", params={})
+        ],
+        id="m1", parent_id="p", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([tool_msg]))
+
+    # The loop's monotonic clock, so the measurement cannot be skewed by wall clock adjustments
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tool_messages = [msg async for msg in bigtalk.stream("test/model", [simple_message],
+                                                         tools=[blocking_1, blocking_2, slow_3])
+                     if msg['role'] == 'tool']
+    duration = loop.time() - start
+
+    assert [r['result'] for r in tool_messages[0]['content']] == ["1", "2", "3"]
+    expected_serial = 0.1 + 0.1 + 0.1
+    assert duration < expected_serial * 0.75
+
+
+@pytest.mark.asyncio
+async def test_sync_tools_run_inline_when_threads_are_disabled(simple_message):
+    """Verify sync tools can opt out of worker threads, e.g. for CPU bound work."""
+
+    bigtalk = BigTalk(run_sync_tools_in_thread=False)
+    tool_threads = []
+
+    def where():
+        tool_threads.append(threading.get_ident())
+        return "ok"
+
+    tool_msg = AssistantMessage(
+        role="assistant",
+        content=[ToolUse(type="tool_use", id=str(i), name="where", params={}) for i in range(2)],
+        id="m1", parent_id="p", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([tool_msg]))
+
+    async for _ in bigtalk.stream("test/model", [simple_message], tools=[where]):
+        pass
+
+    assert tool_threads == [threading.get_ident()] * 2
+
+
+@pytest.mark.asyncio
+async def test_sync_tools_can_opt_into_inline_execution(bigtalk, simple_message):
+    """Verify the sync_inline metadata keeps individual sync tools on the event loop thread."""
+
+    tool_threads = {}
+
+    @tool(metadata={"sync_inline": True})
+    def inline():
+        tool_threads["inline"] = threading.get_ident()
+        return "ok"
+
+    def threaded():
+        tool_threads["threaded"] = threading.get_ident()
+        return "ok"
+
+    tool_msg = AssistantMessage(
+        role="assistant",
+        content=[ToolUse(type="tool_use", id="1", name="inline", params={}),
+                 ToolUse(type="tool_use", id="2", name="threaded", params={})],
+        id="m1", parent_id="p", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([tool_msg]))
+
+    async for _ in bigtalk.stream("test/model", [simple_message], tools=[inline, threaded]):
+        pass
+
+    assert tool_threads["inline"] == threading.get_ident()
+    assert tool_threads["threaded"] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_unhandled_tool_error_does_not_abort_siblings(bigtalk, simple_message):
+    """Verify errors escaping the handler (e.g. from safe tools) become error results instead of cancelling others."""
+
+    @tool(safe=True)
+    async def broken():
+        raise ValueError("broken on purpose")
+
+    async def slow():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    tool_msg = AssistantMessage(
+        role="assistant",
+        content=[
+            ToolUse(type="tool_use", id="1", name="broken", params={}),
+            ToolUse(type="tool_use", id="2", name="slow", params={})
+        ],
+        id="m1", parent_id="p", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([tool_msg]))
+
+    tool_messages = [msg async for msg in bigtalk.stream("test/model", [simple_message], tools=[broken, slow])
+                     if msg['role'] == 'tool']
+
+    results = tool_messages[0]['content']
+    assert results[0] == {"type": "tool_result", "tool_use_id": "1", "result": "broken on purpose", "is_error": True}
+    assert results[1]['result'] == "done"
+    assert results[1]['is_error'] is False
+
+
+@pytest.mark.asyncio
+async def test_unhandled_inline_tool_error_does_not_abort_siblings(bigtalk, simple_message):
+    """Verify errors escaping safe sync tools that run inline become error results as well."""
+
+    @tool(safe=True, metadata={"sync_inline": True})
+    def broken():
+        raise ValueError("broken on purpose")
+
+    async def slow():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    tool_msg = AssistantMessage(
+        role="assistant",
+        content=[
+            ToolUse(type="tool_use", id="1", name="slow", params={}),
+            ToolUse(type="tool_use", id="2", name="broken", params={})
+        ],
+        id="m1", parent_id="p", is_aggregate=True
+    )
+    bigtalk.add_provider("test", lambda: MockToolProvider([tool_msg]))
+
+    tool_messages = [msg async for msg in bigtalk.stream("test/model", [simple_message], tools=[broken, slow])
+                     if msg['role'] == 'tool']
+
+    results = tool_messages[0]['content']
+    assert results[0]['result'] == "done"
+    assert results[0]['is_error'] is False
+    assert results[1] == {"type": "tool_result", "tool_use_id": "2", "result": "broken on purpose", "is_error": True}
+
+
+@pytest.mark.asyncio
+async def test_follow_up_response_pushed_during_tool_execution(bigtalk, simple_message):
+    """Verify responses can be queued on the mock provider while the stream is already running."""
+
+    provider = MockToolProvider([AssistantMessage(
+        role="assistant",
+        content=[ToolUse(type="tool_use", id="1", name="respond_later", params={})],
+        id="m1", parent_id="p", is_aggregate=True
+    )])
+
+    async def respond_later():
+        provider.push(AssistantMessage(role="assistant", content=[Text(type="text", text="Follow-up")], id="m2",
+                                       parent_id="p", is_aggregate=True))
+        return "queued"
+
+    bigtalk.add_provider("test", lambda: provider)
+
+    results = [msg async for msg in bigtalk.stream("test/model", [simple_message], tools=[respond_later])]
+
+    assert [msg['role'] for msg in results] == ["assistant", "tool", "assistant"]
+    assert results[-1]['content'][0]['text'] == "Follow-up"
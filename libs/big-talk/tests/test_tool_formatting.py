@@ -35,3 +35,15 @@ def test_tool_brace_safety():
 
     # It should fall back to the raw string instead of crashing
     assert '{"foo": "bar"}' in json_tool.description
+
+
+def test_tool_without_placeholders_skips_formatting(caplog):
+    """Test that descriptions without braces are taken as they are."""
+
+    @tool(formatting_var="Ignored")
+    def plain_tool():
+        """Returns nothing."""
+        pass
+
+    assert plain_tool.description == "Returns nothing."
+    assert "Failed to format docstring" not in caplog.text
@@ -1,8 +1,15 @@
-from typing import TypedDict, Annotated, Literal, List, Union
+import importlib
+from dataclasses import dataclass
+from datetime import date
+from typing import TypedDict, Annotated, Literal, List, Union, Any
 
+import pytest
 from pydantic import BaseModel, Field
 
-from big_talk.tool import Tool
+from big_talk.tool import Tool, _get_typeddict_hints, _model_json_schema
+
+# big_talk.tool is shadowed by the tool decorator on the package
+tool_module = importlib.import_module("big_talk.tool")
 
 
 # --- Data Structures for Testing ---
@@ -383,3 +390,138 @@ def test_union_anyof_generation():
 
     assert "content" in found_properties, "TextComponent schema was not properly inlined."
     assert "url" in found_properties, "ImageComponent schema was not properly inlined."
+
+
+def forward_ref_func(count: 'int', addresses: List['Address']) -> None:
+    """Stores addresses."""
+    pass
+
+
+def test_string_annotations_are_resolved():
+    tool = Tool.from_func(forward_ref_func)
+    props = tool.parameters["properties"]
+
+    assert props["count"]["type"] == "integer"
+    assert props["addresses"]["type"] == "array"
+    assert props["addresses"]["items"]["properties"]["city"]["type"] == "string"
+
+
+def test_identical_leaf_schemas_are_shared():
+    def first(name: str): pass
+
+    def second(title: str, count: int): pass
+
+    first_props = Tool.from_func(first).parameters["properties"]
+    second_props = Tool.from_func(second).parameters["properties"]
+
+    assert first_props["name"] is second_props["title"]
+    assert second_props["count"] == {"type": "integer"}
+
+    # Shared schemas cannot be changed through one of the tools
+    with pytest.raises(TypeError):
+        first_props["name"]["description"] = "Changed"
+    assert "description" not in second_props["title"]
+
+
+def test_schema_interning_is_bounded(monkeypatch):
+    monkeypatch.setattr(tool_module, "_SCHEMA_INTERN", {})
+    monkeypatch.setattr(tool_module, "_SCHEMA_INTERN_LIMIT", 1)
+
+    def lookup(name: Annotated[str, "The name"], count: Annotated[int, "The count"]): pass
+
+    props = Tool.from_func(lookup).parameters["properties"]
+
+    assert len(tool_module._SCHEMA_INTERN) == 1
+    assert props["count"] == {"type": "integer", "description": "The count"}
+    with pytest.raises(TypeError):
+        props["count"]["type"] = "string"
+
+
+def test_pydantic_type_adapter_fallback():
+    """
+    Verify that types without a native schema (e.g. dates and dataclasses)
+    are described by pydantic when it is installed.
+    """
+
+    @dataclass
+    class Window:
+        start: date
+        days: int
+
+    def book(window: Annotated[Window, "The booking window"], on: date):
+        pass
+
+    tool = Tool.from_func(book)
+    props = tool.parameters["properties"]
+
+    assert props["on"]["type"] == "string"
+    assert props["on"]["format"] == "date"
+    assert props["window"]["description"] == "The booking window"
+    assert props["window"]["properties"]["start"]["format"] == "date"
+    assert "title" not in props["window"]
+    assert tool.parameters["required"] == ["window", "on"]
+
+
+def test_type_adapter_fallback_without_pydantic(monkeypatch):
+    """Without pydantic, types without a native schema stay unsupported."""
+    monkeypatch.setattr(tool_module, "pydantic", None)
+
+    def book(on: date): pass
+
+    with pytest.raises(NotImplementedError):
+        Tool.from_func(book)
+
+
+@pytest.mark.parametrize("with_pydantic", [True, False])
+def test_untyped_parameters_are_not_supported(monkeypatch, with_pydantic):
+    """Any and missing annotations have no type an LLM could fill in, with or without pydantic."""
+    if not with_pydantic:
+        monkeypatch.setattr(tool_module, "pydantic", None)
+
+    def untyped(value): pass
+
+    def any_typed(value: Any): pass
+
+    def object_typed(value: object): pass
+
+    for func in (untyped, any_typed, object_typed):
+        with pytest.raises(NotImplementedError):
+            Tool.from_func(func)
+
+
+def test_typeddict_hints_are_resolved_once():
+    """Verify that a TypedDict shared by several tools only has its type hints resolved once."""
+
+    def update_profile(profile: UserProfile):
+        pass
+
+    def archive_profile(profile: UserProfile):
+        pass
+
+    first = Tool.from_func(update_profile)
+    hits = _get_typeddict_hints.cache_info().hits
+    second = Tool.from_func(archive_profile)
+
+    assert _get_typeddict_hints.cache_info().hits > hits
+    assert first.parameters == second.parameters
+
+
+def test_pydantic_schema_is_generated_once():
+    """Verify that a model shared by several tools is only walked once and every tool gets its own copy."""
+
+    class Item(BaseModel):
+        name: str
+
+    def add_item(item: Item):
+        pass
+
+    def remove_item(item: Item):
+        pass
+
+    first = Tool.from_func(add_item)
+    hits = _model_json_schema.cache_info().hits
+    second = Tool.from_func(remove_item)
+
+    assert _model_json_schema.cache_info().hits > hits
+    assert first.parameters == second.parameters
+    assert first.parameters["properties"]["item"] is not second.parameters["properties"]["item"]
@@ -1,8 +1,19 @@
+import copy
+import functools
+import json
+import pickle
+from dataclasses import FrozenInstanceError
+
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 from big_talk import BigTalk, Tool, tool
 
 
+async def _empty_stream(*args, **kwargs):
+    return
+    yield
+
+
 @pytest.mark.asyncio
 async def test_stream_normalizes_tools(simple_message):
     """Ensure raw functions passed to stream() are converted to Tools."""
@@ -14,11 +25,7 @@ async def test_stream_normalizes_tools(simple_message):
     bt = BigTalk()
     mock_provider = MagicMock()
 
-    async def mock_stream_gen(*args, **kwargs):
-        if False:
-            yield
-
-    mock_provider.stream.side_effect = mock_stream_gen
+    mock_provider.stream.side_effect = _empty_stream
 
     bt.add_provider("mock", lambda: mock_provider)
 
@@ -34,6 +41,12 @@ async def test_stream_normalizes_tools(simple_message):
     assert isinstance(passed_tools[0], Tool)
     assert passed_tools[0].name == "my_raw_func"
 
+    # The schema is only generated once, later streams reuse the same Tool
+    async for _ in bt.stream("mock/model", [simple_message], tools=[my_raw_func]):
+        pass
+
+    assert mock_provider.stream.call_args.kwargs["tools"][0] is passed_tools[0]
+
 
 def test_tool_decorator_styles():
     # Style 1: Bare decorator
@@ -58,3 +71,88 @@ def test_tool_decorator_styles():
 
     assert isinstance(manual_tool, Tool)
     assert manual_tool.metadata == {"type": "manual"}
+
+
+def test_tool_is_immutable():
+    metadata = {"scope": "read"}
+
+    @tool(metadata=metadata)
+    def read_tool(x: int): return x
+
+    with pytest.raises(FrozenInstanceError):
+        read_tool.name = "write_tool"
+
+    # The tool keeps its own copy of the metadata
+    metadata["scope"] = "write"
+
+    assert read_tool.metadata == {"scope": "read"}
+
+    # Tools are shared, so neither their metadata nor their schema can be changed through one of their users
+    with pytest.raises(TypeError):
+        read_tool.metadata["scope"] = "write"
+    with pytest.raises(TypeError):
+        read_tool.parameters["properties"]["x"]["type"] = "string"
+    with pytest.raises(TypeError):
+        read_tool.parameters["required"].append("y")
+
+    assert read_tool.metadata == {"scope": "read"}
+    assert json.loads(read_tool.parameters_json) == read_tool.parameters
+
+
+def test_tools_are_hashable():
+    @tool(metadata={"scope": "read"})
+    def read_tool(x: int): return x
+
+    def write_tool(x: int): return x
+
+    tools = {read_tool, Tool.from_func(write_tool), Tool.from_func(write_tool)}
+
+    assert len(tools) == 2
+    assert read_tool in tools
+    assert hash(read_tool) == hash(Tool(name=read_tool.name, description=read_tool.description,
+                                        parameters=read_tool.parameters, func=read_tool.func,
+                                        metadata={"scope": "read"}))
+
+
+def test_tool_data_is_serializable():
+    @tool(metadata={"scope": "read"})
+    def read_tool(x: int, tags: list[str]): return x
+
+    for value in (read_tool.parameters, read_tool.metadata):
+        assert json.loads(json.dumps(value)) == value
+        assert copy.deepcopy(value) == value
+        assert pickle.loads(pickle.dumps(value)) == value
+
+    # Copies can be changed again
+    parameters = copy.deepcopy(read_tool.parameters)
+    parameters["required"].append("y")
+    assert dict(read_tool.metadata) | {"scope": "write"} == {"scope": "write"}
+
+
+def test_from_func_reuses_tool_for_plain_functions():
+    def lookup(key: str):
+        """Looks up a key."""
+        pass
+
+    plain = Tool.from_func(lookup)
+
+    assert Tool.from_func(lookup) is plain
+    assert tool(lookup) is plain
+
+    # functools.wraps copies the cached tool onto the wrapper, which must not be mistaken for its own
+    @functools.wraps(lookup)
+    def wrapper(key: str):
+        return lookup(key)
+
+    assert Tool.from_func(wrapper).func is wrapper
+    assert Tool.from_func(lookup, metadata={"scope": "read"}) is not plain
+
+
+def test_parameters_json_is_encoded_once():
+    @tool
+    def search(query: str, limit: int = 10): pass
+
+    encoded = search.parameters_json
+
+    assert json.loads(encoded) == search.parameters
+    assert search.parameters_json is encoded